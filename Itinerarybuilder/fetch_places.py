@@ -1,38 +1,44 @@
 # fetch_places.py
 
 import requests
+import threading
 import time
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from utils.place_info import load_google_api_key, map_price_level
+from .utils.http_client import get_json, google_url
+from .utils.cache_refresh import StaleWhileRevalidate
+from .utils.sqlite_cache import SQLiteCache
 
-GOOGLE_PLACES_API_URL = "https://maps.googleapis.com/maps/api/place/nearbysearch/json"
-GEOCODE_API_URL = "https://maps.googleapis.com/maps/api/geocode/json"
+GOOGLE_PLACES_API_URL = google_url("/maps/api/place/nearbysearch/json")
+GEOCODE_API_URL = google_url("/maps/api/geocode/json")
+NEXT_PAGE_TOKEN_DELAY_SECONDS = 2
+
+# 🔹 Background paging for fetch_places(prefetch=True), one job per cache key at a time
+_prefetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("PLACES_PREFETCH_WORKERS", "2")), thread_name_prefix="places-prefetch"
+)
+_prefetch_lock = threading.Lock()
+_prefetching = set()
 
 # 🔹 Optional: In-memory cache for coordinates to avoid repeat Geocode API calls
 _location_cache = {}
 
-# 🔹 Basic file-based cache for place search results
-_CACHE_FILE = os.path.join("cache", "places_cache.json")
-
-
-def _load_cache():
-    if os.path.exists(_CACHE_FILE):
-        try:
-            with open(_CACHE_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
-
-
-def _save_cache(cache):
-    os.makedirs(os.path.dirname(_CACHE_FILE), exist_ok=True)
-    with open(_CACHE_FILE, "w") as f:
-        json.dump(cache, f)
-
-
-_places_cache = _load_cache()
+# 🔹 Persistent place-search cache (SQLite, shared by all workers); the old JSON file is imported once
+_LEGACY_CACHE_FILE = os.path.join("cache", "places_cache.json")
+PLACES_CACHE_TTL_SECONDS = int(os.getenv("PLACES_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+# Past the TTL an entry is still served (and refreshed in the background) for this long
+PLACES_CACHE_MAX_STALE_SECONDS = int(os.getenv("PLACES_CACHE_MAX_STALE_SECONDS", str(60 * 24 * 3600)))
+PLACES_CACHE_MAX_ENTRIES = int(os.getenv("PLACES_CACHE_MAX_ENTRIES", "5000"))
+
+_places_cache = SQLiteCache(
+    "places",
+    ttl_seconds=PLACES_CACHE_TTL_SECONDS,
+    max_stale_seconds=PLACES_CACHE_MAX_STALE_SECONDS,
+    max_entries=PLACES_CACHE_MAX_ENTRIES,
+    legacy_json=_LEGACY_CACHE_FILE,
+)
+_places_swr = StaleWhileRevalidate(_places_cache)
 
 def get_coordinates_for_location(location, api_key):
     """Fetch dynamic lat/lng for a location using Google Geocoding API (with caching)."""
@@ -56,16 +62,39 @@ def construct_photo_url(photo_reference, api_key):
         return None
     return f"https://maps.googleapis.com/maps/api/place/photo?maxwidth=800&photoreference={photo_reference}&key={api_key}"
 
-def fetch_places(location, max_results=100, radius=15000, use_cache=True):
+def fetch_places(location, max_results=100, radius=15000, use_cache=True, prefetch=False,
+                 on_more_places=None):
     """Fetch top tourist attractions for a location and map budget levels with disclaimers.
-    Results are cached based on request parameters to avoid redundant API calls.
+    Results are cached based on request parameters to avoid redundant API calls;
+    entries past their TTL are served immediately and refreshed in the background.
+
+    With ``prefetch=True`` a cache miss returns the first result page right away
+    (no next_page_token waits on the caller's thread). The remaining pages are
+    fetched in the background; once done, the full list is cached and
+    ``on_more_places(location, places)`` is called with the places that were not
+    in the first page (e.g. to tag them and store them in Firestore).
     """
     api_key = load_google_api_key()
-
     cache_key = f"{location}-{max_results}-{radius}"
-    if use_cache and cache_key in _places_cache:
-        return _places_cache[cache_key]
 
+    def fetch():
+        return _fetch_places_from_api(location, max_results, radius, api_key)
+
+    if not use_cache:
+        return fetch()
+
+    if prefetch and _places_cache.get_entry(cache_key) is None:
+        return _fetch_first_page_then_prefetch(location, max_results, radius, api_key, cache_key, on_more_places)
+
+    return _places_swr.get_or_fetch(cache_key, fetch)
+
+
+def places_cache_stats():
+    return _places_swr.stats()
+
+
+def _iter_place_pages(location, radius, api_key):
+    """Yield one list of mapped places per Nearby Search page (waits before each next_page_token)."""
     # ✅ Dynamically get coordinates with caching
     coords = get_coordinates_for_location(location, api_key)
     lat_lng = f"{coords['lat']},{coords['lng']}"
@@ -77,20 +106,14 @@ def fetch_places(location, max_results=100, radius=15000, use_cache=True):
         "key": api_key
     }
 
-    results = []
-    seen_place_ids = set()
-
-    while len(results) < max_results:
-        response = requests.get(GOOGLE_PLACES_API_URL, params=params)
-        data = response.json()
+    while True:
+        data = get_json(GOOGLE_PLACES_API_URL, params=params)
 
         if "results" not in data:
-            break
+            return
 
+        page = []
         for place in data["results"]:
-            if place["place_id"] in seen_place_ids:
-                continue
-
             photo_reference = None
             if "photos" in place:
                 photo_reference = place["photos"][0].get("photo_reference")
@@ -99,7 +122,7 @@ def fetch_places(location, max_results=100, radius=15000, use_cache=True):
             budget = map_price_level(place.get("price_level"))
             disclaimer = "Price info not available" if budget == "unknown" else ""
 
-            place_data = {
+            page.append({
                 "place_id": place["place_id"],
                 "name": place["name"],
                 "rating": place.get("rating"),
@@ -110,20 +133,66 @@ def fetch_places(location, max_results=100, radius=15000, use_cache=True):
                 "coordinates": place["geometry"]["location"],
                 "photo_url": construct_photo_url(photo_reference, api_key),
                 "disclaimer": disclaimer
-            }
-
-            results.append(place_data)
-            seen_place_ids.add(place["place_id"])
+            })
+        yield page
 
         # ✅ Handle pagination
-        if "next_page_token" in data:
-            time.sleep(2)  # Google requires a delay before using next_page_token
-            params = {"key": api_key, "pagetoken": data["next_page_token"]}
-        else:
+        if "next_page_token" not in data:
+            return
+        time.sleep(NEXT_PAGE_TOKEN_DELAY_SECONDS)  # Google requires a delay before using next_page_token
+        params = {"key": api_key, "pagetoken": data["next_page_token"]}
+
+
+def _collect(pages, max_results, results=None, seen_place_ids=None):
+    """Append unseen places from `pages` to results until max_results."""
+    results = [] if results is None else results
+    seen_place_ids = {p["place_id"] for p in results} if seen_place_ids is None else seen_place_ids
+    for page in pages:
+        for place in page:
+            if place["place_id"] in seen_place_ids:
+                continue
+            results.append(place)
+            seen_place_ids.add(place["place_id"])
+        if len(results) >= max_results:
             break
+    return results[:max_results]
 
-    trimmed = results[:max_results]
-    if use_cache:
-        _places_cache[cache_key] = trimmed
-        _save_cache(_places_cache)
-    return trimmed
+
+def _fetch_places_from_api(location, max_results, radius, api_key):
+    """Nearby Search with pagination; returns up to max_results mapped places."""
+    return _collect(_iter_place_pages(location, radius, api_key), max_results)
+
+
+def _fetch_first_page_then_prefetch(location, max_results, radius, api_key, cache_key, on_more_places):
+    pages = _iter_place_pages(location, radius, api_key)
+    first = _collect([next(pages, [])], max_results)
+
+    if len(first) >= max_results:
+        pages.close()
+        _places_cache.set(cache_key, first)
+        return first
+
+    with _prefetch_lock:
+        if cache_key in _prefetching:
+            pages.close()
+            return first
+        _prefetching.add(cache_key)
+
+    # Copied here, before the caller gets `first` back and starts tagging those dicts
+    first_copy = [dict(p) for p in first]
+
+    def finish():
+        try:
+            results = _collect(pages, max_results, results=first_copy)
+            _places_cache.set(cache_key, results)
+            print(f"📥 Prefetched {len(results) - len(first)} more places for {location} in the background.")
+            if on_more_places and len(results) > len(first):
+                on_more_places(location, results[len(first):])
+        except Exception as e:
+            print(f"❌ Background place prefetch failed for {location}: {e}")
+        finally:
+            with _prefetch_lock:
+                _prefetching.discard(cache_key)
+
+    _prefetch_executor.submit(finish)
+    return first
@@ -1,47 +1,36 @@
 # get_reviews.py
 
 import requests
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
 from utils.place_info import load_google_api_key
-
-GOOGLE_PLACE_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
-
-# 🔹 Basic file-based cache for place reviews
-_CACHE_FILE = os.path.join("cache", "reviews_cache.json")
-
-
-def _load_cache():
-    if os.path.exists(_CACHE_FILE):
-        try:
-            with open(_CACHE_FILE, "r") as f:
-                return json.load(f)
-        except Exception:
-            return {}
-    return {}
-
-
-def _save_cache(cache):
-    os.makedirs(os.path.dirname(_CACHE_FILE), exist_ok=True)
-    with open(_CACHE_FILE, "w") as f:
-        json.dump(cache, f)
-
-
-_reviews_cache = _load_cache()
-
-def get_reviews_for_place(place_id, max_reviews=10, min_words=3, use_cache=True):
-    """
-    Fetches up to `max_reviews` user reviews for a place.
-    Cleans out short/low-quality reviews.
-    Results are cached to avoid repeat API calls.
-    Returns a list of review texts.
-    """
-    api_key = load_google_api_key()
-
-    cache_key = f"{place_id}-{max_reviews}-{min_words}"
-    if use_cache and cache_key in _reviews_cache:
-        return _reviews_cache[cache_key]
-
+from .utils.http_client import get_json, google_url
+from .utils.cache_refresh import StaleWhileRevalidate
+from .utils.sqlite_cache import SQLiteCache
+
+GOOGLE_PLACE_DETAILS_URL = google_url("/maps/api/place/details/json")
+
+# Parallel Place Details calls in get_reviews_for_places (per-host limit still applies)
+REVIEW_FETCH_WORKERS = int(os.getenv("REVIEW_FETCH_WORKERS", "8"))
+
+# 🔹 Persistent review cache (SQLite, shared by all workers); the old JSON file is imported once
+_LEGACY_CACHE_FILE = os.path.join("cache", "reviews_cache.json")
+REVIEWS_CACHE_TTL_SECONDS = int(os.getenv("REVIEWS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# Past the TTL an entry is still served (and refreshed in the background) for this long
+REVIEWS_CACHE_MAX_STALE_SECONDS = int(os.getenv("REVIEWS_CACHE_MAX_STALE_SECONDS", str(30 * 24 * 3600)))
+REVIEWS_CACHE_MAX_ENTRIES = int(os.getenv("REVIEWS_CACHE_MAX_ENTRIES", "50000"))
+
+_reviews_cache = SQLiteCache(
+    "reviews",
+    ttl_seconds=REVIEWS_CACHE_TTL_SECONDS,
+    max_stale_seconds=REVIEWS_CACHE_MAX_STALE_SECONDS,
+    max_entries=REVIEWS_CACHE_MAX_ENTRIES,
+    legacy_json=_LEGACY_CACHE_FILE,
+)
+_reviews_swr = StaleWhileRevalidate(_reviews_cache)
+
+def _fetch_reviews(place_id, max_reviews, min_words, api_key):
+    """Place Details call; returns cleaned review texts, or None when the result must not be cached."""
     params = {
         "place_id": place_id,
         "fields": "review",
@@ -49,19 +38,18 @@ def get_reviews_for_place(place_id, max_reviews=10, min_words=3, use_cache=True)
     }
 
     try:
-        response = requests.get(GOOGLE_PLACE_DETAILS_URL, params=params)
-        data = response.json()
+        data = get_json(GOOGLE_PLACE_DETAILS_URL, params=params)
 
         # ✅ Handle API error states
         status = data.get("status")
         if status and status != "OK":
             print(f"⚠️ Google API returned status {status} for place_id {place_id}")
-            return []
+            return None
 
         # ✅ Safely handle missing reviews
         reviews_data = data.get("result", {}).get("reviews", [])
         if not reviews_data:
-            return []
+            return None
 
         # ✅ Clean and filter reviews
         reviews = []
@@ -70,16 +58,56 @@ def get_reviews_for_place(place_id, max_reviews=10, min_words=3, use_cache=True)
             if len(text.split()) >= min_words:  # Filter out "Good", "Nice", etc.
                 reviews.append(text)
 
-        if use_cache:
-            _reviews_cache[cache_key] = reviews
-            _save_cache(_reviews_cache)
-
         return reviews
 
     except requests.exceptions.RequestException as e:
         print(f"🌐 Network error fetching reviews for {place_id}: {e}")
-        return []
+        return None
 
     except Exception as e:
         print(f"❌ Unexpected error while fetching reviews for {place_id}: {e}")
+        return None
+
+
+def get_reviews_for_place(place_id, max_reviews=10, min_words=3, use_cache=True, api_key=None):
+    """
+    Fetches up to `max_reviews` user reviews for a place.
+    Cleans out short/low-quality reviews.
+    Results are cached to avoid repeat API calls; entries past their TTL are
+    served immediately and refreshed in the background (stale-while-revalidate).
+    Returns a list of review texts.
+    """
+    api_key = api_key or load_google_api_key()
+
+    def fetch():
+        return _fetch_reviews(place_id, max_reviews, min_words, api_key)
+
+    if not use_cache:
+        return fetch() or []
+
+    cache_key = f"{place_id}-{max_reviews}-{min_words}"
+    return _reviews_swr.get_or_fetch(cache_key, fetch) or []
+
+
+def review_cache_stats():
+    return _reviews_swr.stats()
+
+
+def get_reviews_for_places(place_ids, max_reviews=10, min_words=3, use_cache=True,
+                           max_workers=REVIEW_FETCH_WORKERS, api_key=None):
+    """
+    Concurrent ``get_reviews_for_place`` for many places.
+    Calls share one pooled HTTP session (keep-alive, per-host limit, retry/backoff).
+    Returns one review list per place id, in input order.
+    """
+    if not place_ids:
         return []
+    api_key = api_key or load_google_api_key()
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(place_ids))),
+                            thread_name_prefix="review-fetch") as pool:
+        return list(pool.map(
+            lambda place_id: get_reviews_for_place(
+                place_id, max_reviews=max_reviews, min_words=min_words, use_cache=use_cache, api_key=api_key
+            ),
+            place_ids,
+        ))
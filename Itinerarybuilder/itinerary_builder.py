@@ -2,8 +2,30 @@
 from datetime import datetime, timedelta
 import firebase_admin
 from firebase_admin import credentials, firestore
+import logging
 import os
+import time
 import dateutil.parser
+from utils.city_index import city_index
+from utils.gem_cache import gem_cache
+from utils.gem_queries import normalize_tags, query_gem_submissions
+from .utils.day_scheduler import SCHEDULER_MODES, schedule_days
+
+# "city": stream a city's verified gems and match tags locally;
+# "collection_group": filter city and tags in Firestore (see fetch_hidden_gems_from_firebase)
+HIDDEN_GEM_QUERY_MODE = os.getenv("HIDDEN_GEM_QUERY_MODE", "city")
+
+# "clustered": one geographic area per day (k-means + capacity-aware assignment);
+# "sequential": the old fill-days-in-input-order behaviour
+ITINERARY_SCHEDULER = os.getenv("ITINERARY_SCHEDULER", "clustered")
+if ITINERARY_SCHEDULER not in SCHEDULER_MODES:
+    raise ValueError(f"ITINERARY_SCHEDULER must be one of {SCHEDULER_MODES}, got '{ITINERARY_SCHEDULER}'")
+
+# Request-path logging: one INFO summary per hidden-gem fetch / itinerary; the
+# per-gem and per-day detail is DEBUG (ITINERARY_LOG_LEVEL=DEBUG to see it).
+# Messages use %-style args so nothing is formatted when the level is off.
+logger = logging.getLogger(__name__)
+logger.setLevel(os.getenv("ITINERARY_LOG_LEVEL", "INFO").upper())
 
 def _get_firestore_client():
     """Get Firestore client, initializing Firebase if needed."""
@@ -171,173 +193,174 @@ def debug_firebase_structure():
 # 2. Firestore follows the hierarchy: hidden_gems/{state}/cities/{city}/gem_submissions.
 # 3. Hidden gems are only considered if their `status` field is "verified".
 # 4. User interests (`user_interests`) are expected to be a list of tags for matching.
-# 5. Matching is done by normalizing city names to lowercase and removing spaces.
+# 5. Matching goes through utils.city_index: lowercase, alphanumerics only, known aliases folded.
 # 6. Only gems whose tags intersect with user interests are included in the output.
 # 7. If no city matches, the function does NOT fall back to state-level or global search.
 # -----------------------------------------------------------------------------
 
 
-def fetch_hidden_gems_from_firebase(location, user_interests):
+def _hidden_gem_from_data(gem_id, data, user_tags, region):
+    """Itinerary entry for a verified gem, or None if its tags miss the user's interests."""
+    if not data:
+        return None
+
+    # Get gem tags and check intersection
+    gem_tags_raw = data.get("tags", [])
+    if isinstance(gem_tags_raw, str):
+        gem_tags_raw = [gem_tags_raw]
+
+    gem_tags = set(tag.lower().strip() for tag in gem_tags_raw if tag)
+
+    # Only include if tags intersect with user interests
+    tag_intersection = user_tags.intersection(gem_tags)
+    if not tag_intersection:
+        logger.debug("gem %s skipped: tags=%s, no overlap with interests", gem_id, gem_tags_raw)
+        return None
+    logger.debug("gem %s matched on %s", gem_id, tag_intersection)
+
+    # Determine best time
+    best_time = data.get("best_time", "Anytime")
+    if best_time == "Anytime" or not best_time:
+        for tag in gem_tags_raw:
+            if tag.lower() in TAG_TO_BEST_TIME:
+                best_time = TAG_TO_BEST_TIME[tag.lower()]
+                break
+
+    description = data.get("description", "Local Discovery")
+    truncated_desc = (description[:50] + "...") if len(description) > 50 else description
+
+    # Handle coordinates
+    coordinates = data.get("coordinates", {})
+    if isinstance(coordinates, dict) and "lat" in coordinates and "lng" in coordinates:
+        coords = coordinates
+    elif isinstance(coordinates, dict) and "latitude" in coordinates and "longitude" in coordinates:
+        coords = {"lat": coordinates["latitude"], "lng": coordinates["longitude"]}
+    else:
+        coords = {}
+
+    return {
+        "name": f"🔍 Hidden Gem: {truncated_desc}",
+        "tags": gem_tags_raw,
+        "best_time": best_time,
+        "budget_category": data.get("budget_category", "unknown"),
+        "disclaimer": "🌟 Hidden gem suggested by locals",
+        "photo_url": data.get("image_urls", [""])[0] if data.get("image_urls") else "",
+        "coordinates": coords,
+        "description": description,
+        "gem_id": gem_id,
+        "city_name": data.get("city_name", ""),
+        "state_name": data.get("state_name", ""),
+        "region": region,
+        "status": data.get("status", "unknown")
+    }
+
+
+def _region_of(gem_doc):
+    """'hidden_gems/{state}/cities/{city}/gem_submissions/{id}' -> '{state}/{city}'."""
+    parts = gem_doc.reference.path.split("/")
+    return f"{parts[1]}/{parts[3]}" if len(parts) >= 6 else ""
+
+
+def fetch_hidden_gems_from_firebase(location, user_interests, mode=None):
     """
     Fetch hidden gems from Firebase that match user interests and location.
-    Uses direct path access since state documents don't exist as documents.
+    Resolves the city through the hidden gem city index (utils.city_index), then
+      - "city" mode: streams that city's verified gem_submissions and matches tags here;
+      - "collection_group" mode: one collection-group query per city (and per 30 tags)
+        with city_name and tag filters applied by Firestore, so only matching gems
+        are read. Needs the tags_normalized field (utils.gem_queries.backfill_normalized_tags).
+    mode defaults to HIDDEN_GEM_QUERY_MODE. Per-city results are kept in utils.gem_cache,
+    so repeat requests for a city make no Firestore queries until a gem changes or the TTL ends.
     """
+    mode = mode or HIDDEN_GEM_QUERY_MODE
+    started = time.perf_counter()
+    summary = {
+        "location": location, "mode": mode, "cities": 0, "queries": 0,
+        "gems_scanned": 0, "gems_matched": 0, "gem_errors": 0, "city_errors": 0,
+        "index_ms": 0.0, "load_ms": 0.0, "match_ms": 0.0,
+    }
+    matching_gems = []
     try:
         db = _get_firestore_client()
 
         # ✅ Normalize user input
-        location_normalized = location.lower().strip().replace(" ", "")
-        user_tags = set(tag.lower() for tag in user_interests)
-        print(f"🔍 Searching for hidden gems in '{location}' matching tags: {user_interests}")
-
-        matching_gems = []
-
-        # ✅ Enhanced location matching with common aliases
-        location_variants = [
-            location.lower(),
-            location_normalized,
-            location.title(),
-            location.upper(),
-        ]
-        
-        # Add common city aliases
-        if "bengaluru" in location.lower():
-            location_variants.extend(["bangalore", "bengalooru"])
-        elif "bangalore" in location.lower():
-            location_variants.extend(["bengaluru", "bengalooru"])
+        user_tags = set(normalize_tags(user_interests))
 
-        print(f"🔍 Trying location variants: {location_variants}")
-
-        # ✅ Get all state document references (they may not have data but have subcollections)
+        # ✅ City index lookup (normalized names + aliases) instead of listing every state and city
+        t0 = time.perf_counter()
         try:
-            hidden_gems_ref = db.collection("hidden_gems")
-            state_refs = list(hidden_gems_ref.list_documents())  # Use list_documents instead of stream
-            print(f"📊 Found {len(state_refs)} state document references")
-            
-            for state_ref in state_refs:
-                state_id = state_ref.id
-                print(f"🏛️ Checking state: {state_id}")
-                
+            city_paths = city_index.paths_for(db, location)
+        except Exception as e:
+            logger.warning("hidden gem city index lookup failed for %r: %s", location, e)
+            return []
+        finally:
+            summary["index_ms"] = (time.perf_counter() - t0) * 1000
+        summary["cities"] = len(city_paths)
+        logger.debug("city index matched %s for %r (interests=%s)", city_paths, location, user_interests)
+
+        if mode == "collection_group" and not user_tags:
+            return []
+
+        def load_city(state_id, city_id):
+            """[(gem_id, region, data)] for one city; only runs on a gem_cache miss."""
+            if mode == "collection_group":
+                gem_docs, queries = query_gem_submissions(db, status="verified", city_names=[city_id], tags=user_tags)
+                summary["queries"] += queries
+                return [(doc.id, _region_of(doc), doc.to_dict()) for doc in gem_docs]
+            # Get gems from this city
+            gems_ref = db.collection("hidden_gems").document(state_id).collection("cities").document(city_id).collection("gem_submissions")
+            verified_docs = list(gems_ref.where("status", "==", "verified").stream())
+            summary["queries"] += 1
+            return [(doc.id, f"{state_id}/{city_id}", doc.to_dict()) for doc in verified_docs]
+
+        for state_id, city_id in city_paths:
+            # collection_group results depend on the tags; city results are every verified gem
+            extra = ("tags",) + tuple(sorted(user_tags)) if mode == "collection_group" else ()
+            cache_key = gem_cache.key(city_id, mode, state_id, *extra)
+            t0 = time.perf_counter()
+            try:
+                gem_records = gem_cache.get_or_load(cache_key, lambda: load_city(state_id, city_id))
+            except Exception as e:
+                summary["city_errors"] += 1
+                logger.warning("hidden gems unavailable for %s/%s: %s", state_id, city_id, e)
+                continue
+            finally:
+                summary["load_ms"] += (time.perf_counter() - t0) * 1000
+            summary["gems_scanned"] += len(gem_records)
+
+            t0 = time.perf_counter()
+            for gem_id, region, data in gem_records:
                 try:
-                    # Check cities subcollection
-                    cities_ref = state_ref.collection("cities")
-                    city_refs = list(cities_ref.list_documents())
-                    print(f"   📍 Found {len(city_refs)} city references")
-                    
-                    for city_ref in city_refs:
-                        city_id = city_ref.id
-                        print(f"      🏙️ Checking city: {city_id}")
-                        
-                        # Check if this city matches any of our location variants
-                        city_match = False
-                        for variant in location_variants:
-                            variant_norm = variant.lower().replace(" ", "")
-                            city_norm = city_id.lower().replace(" ", "")
-                            if (variant_norm in city_norm or 
-                                city_norm in variant_norm or
-                                variant_norm == city_norm):
-                                city_match = True
-                                print(f"         ✅ City match: '{variant}' matches '{city_id}'")
-                                break
-                        
-                        if city_match:
-                            try:
-                                # Get gems from this city
-                                gems_ref = city_ref.collection("gem_submissions")
-                                verified_docs = list(gems_ref.where("status", "==", "verified").stream())
-                                print(f"         💎 Found {len(verified_docs)} verified gems")
-                                
-                                for gem_doc in verified_docs:
-                                    try:
-                                        data = gem_doc.to_dict()
-                                        if not data:
-                                            continue
-
-                                        # Get gem tags and check intersection
-                                        gem_tags_raw = data.get("tags", [])
-                                        if isinstance(gem_tags_raw, str):
-                                            gem_tags_raw = [gem_tags_raw]
-                                        
-                                        gem_tags = set(tag.lower().strip() for tag in gem_tags_raw if tag)
-                                        
-                                        print(f"         🏷️ Gem {gem_doc.id}: tags={gem_tags_raw}")
-
-                                        # Only include if tags intersect with user interests
-                                        tag_intersection = user_tags.intersection(gem_tags)
-                                        if tag_intersection:
-                                            print(f"            ✅ Tag match found: {tag_intersection}")
-                                            
-                                            # Determine best time
-                                            best_time = data.get("best_time", "Anytime")
-                                            if best_time == "Anytime" or not best_time:
-                                                for tag in gem_tags_raw:
-                                                    if tag.lower() in TAG_TO_BEST_TIME:
-                                                        best_time = TAG_TO_BEST_TIME[tag.lower()]
-                                                        break
-                                            
-                                            description = data.get("description", "Local Discovery")
-                                            truncated_desc = (description[:50] + "...") if len(description) > 50 else description
-
-                                            # Handle coordinates
-                                            coordinates = data.get("coordinates", {})
-                                            if isinstance(coordinates, dict) and "lat" in coordinates and "lng" in coordinates:
-                                                coords = coordinates
-                                            elif isinstance(coordinates, dict) and "latitude" in coordinates and "longitude" in coordinates:
-                                                coords = {"lat": coordinates["latitude"], "lng": coordinates["longitude"]}
-                                            else:
-                                                coords = {}
-
-                                            gem = {
-                                                "name": f"🔍 Hidden Gem: {truncated_desc}",
-                                                "tags": gem_tags_raw,
-                                                "best_time": best_time,
-                                                "budget_category": data.get("budget_category", "unknown"),
-                                                "disclaimer": "🌟 Hidden gem suggested by locals",
-                                                "photo_url": data.get("image_urls", [""])[0] if data.get("image_urls") else "",
-                                                "coordinates": coords,
-                                                "description": description,
-                                                "gem_id": gem_doc.id,
-                                                "city_name": data.get("city_name", ""),
-                                                "state_name": data.get("state_name", ""),
-                                                "region": f"{state_id}/{city_id}",
-                                                "status": data.get("status", "unknown")
-                                            }
-                                            matching_gems.append(gem)
-                                            print(f"            ✅ Added to final list: {truncated_desc}")
-                                        else:
-                                            print(f"            ❌ No tag intersection for gem {gem_doc.id}")
-
-                                    except Exception as e:
-                                        print(f"         ⚠️ Error processing gem {gem_doc.id}: {e}")
-                                        continue
-                                        
-                            except Exception as e:
-                                print(f"      ❌ Error accessing gems in {city_id}: {e}")
-                                continue
-                                
+                    gem = _hidden_gem_from_data(gem_id, data, user_tags, region)
+                    if gem:
+                        matching_gems.append(gem)
                 except Exception as e:
-                    print(f"   ❌ Error accessing cities in {state_id}: {e}")
+                    summary["gem_errors"] += 1
+                    logger.debug("gem %s could not be processed: %s", gem_id, e)
                     continue
-                    
-        except Exception as e:
-            print(f"❌ Error accessing hidden_gems collection: {e}")
-            return []
+            summary["match_ms"] += (time.perf_counter() - t0) * 1000
 
-        print(f"🎉 Final result: {len(matching_gems)} hidden gems matching user interests")
         return matching_gems
 
-    except Exception as e:
-        print(f"❌ Critical error fetching hidden gems for {location}: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("critical error fetching hidden gems for %r", location)
         return []
+    finally:
+        summary["gems_matched"] = len(matching_gems)
+        summary["total_ms"] = (time.perf_counter() - started) * 1000
+        for key in ("index_ms", "load_ms", "match_ms", "total_ms"):
+            summary[key] = round(summary[key], 1)
+        logger.info("hidden_gems %s", summary, extra={"summary": summary})
+
 
 def generate_itinerary(filtered_pois, start_date, end_date, enable_hidden_gems=False, max_per_day=2, location=None, user_interests=None):
     """
     Generate a scalable itinerary without attaching fixed dates.
-    Distributes POIs across available days and includes disclaimers + photos.
+    Distributes POIs and hidden gems across available days (see utils.day_scheduler)
+    and includes disclaimers + photos.
     ``max_per_day`` controls how many POIs can be assigned to a single day.
     """
+    started = time.perf_counter()
     start = dateutil.parser.isoparse(start_date)
     end = dateutil.parser.isoparse(end_date)
     num_days = (end - start).days + 1
@@ -346,7 +369,6 @@ def generate_itinerary(filtered_pois, start_date, end_date, enable_hidden_gems=F
     hidden_gems = []
     if enable_hidden_gems and location and user_interests:
         hidden_gems = fetch_hidden_gems_from_firebase(location, user_interests)
-        print(f"🎯 Found {len(hidden_gems)} hidden gems to integrate")
 
     # ✅ Adjust max_per_day to accommodate hidden gems
     regular_poi_limit = max_per_day
@@ -356,102 +378,74 @@ def generate_itinerary(filtered_pois, start_date, end_date, enable_hidden_gems=F
         # Reserve space for hidden gems by keeping regular POI limit at original value
         # but increase total capacity
         effective_max_per_day = max_per_day + 1
-        print(f"📈 Increased daily POI limit from {max_per_day} to {effective_max_per_day} to accommodate hidden gems")
-        print(f"🎯 Regular POIs will use {regular_poi_limit} slots, hidden gems will use the extra slot")
     else:
         regular_poi_limit = max_per_day
 
     # ✅ Instead of dates, we use day indices (Day 1, Day 2...)
     itinerary = {f"Day {i+1}": [] for i in range(num_days)}
-    current_day_idx = 0
-    current_day_count = 0
     day_keys = list(itinerary.keys())
 
-    for poi in filtered_pois:
-        if current_day_idx >= len(day_keys):
-            break
-        # Move to next day if the current one is filled (use regular_poi_limit to reserve space for hidden gems)
-        if current_day_count >= regular_poi_limit:
-            current_day_idx += 1
-            current_day_count = 0
-            if current_day_idx >= len(day_keys):
-                break
+    # ✅ One pass over POIs + gems: geographic day clusters with per-day slot limits
+    # (regular POIs keep regular_poi_limit; gems use the extra slot or any free one)
+    schedule = schedule_days(filtered_pois, hidden_gems, num_days, regular_poi_limit,
+                             effective_max_per_day, mode=ITINERARY_SCHEDULER)
+
+    gems_placed = 0
+    for day_key, day_items in zip(day_keys, schedule):
+        for kind, idx in day_items:
+            if kind == "gem":
+                itinerary[day_key].append(hidden_gems[idx])
+                gems_placed += 1
+                continue
+            poi = filtered_pois[idx]
+
+            # ✅ Determine best time to visit
+            best_time = poi.get("best_time") or "Anytime"
+            if best_time == "Anytime":
+                for tag in poi.get("tags", []):
+                    if tag in TAG_TO_BEST_TIME:
+                        best_time = TAG_TO_BEST_TIME[tag]
+                        break
 
-        # ✅ Determine best time to visit
-        best_time = poi.get("best_time") or "Anytime"
-        if best_time == "Anytime":
-            for tag in poi.get("tags", []):
-                if tag in TAG_TO_BEST_TIME:
-                    best_time = TAG_TO_BEST_TIME[tag]
-                    break
-
-        activity = {
-            "name": poi["name"],
-            "tags": poi.get("tags", []),
-            "best_time": best_time,
-            "budget_category": poi.get("budget_category", "unknown"),
-            "disclaimer": poi.get("disclaimer", ""),
-            "photo_url": poi.get("photo_url", ""),
-            "coordinates": poi.get("coordinates", {})  # ✅ For future route optimization
-        }
-
-        itinerary[day_keys[current_day_idx]].append(activity)
-        current_day_count += 1
-
-    # ✅ Add Hidden Gems from Firebase
-    if hidden_gems:
-        print(f"🌟 Integrating {len(hidden_gems)} hidden gems into itinerary...")
-        print(f"📊 Current itinerary state before adding gems:")
-        for day_key in day_keys:
-            print(f"   {day_key}: {len(itinerary[day_key])} activities (max allowed: {effective_max_per_day})")
-        
-        # Add hidden gems to days that have space
-        gem_index = 0
-        for day_key in day_keys:
-            if gem_index >= len(hidden_gems):
+            activity = {
+                "name": poi["name"],
+                "tags": poi.get("tags", []),
+                "best_time": best_time,
+                "budget_category": poi.get("budget_category", "unknown"),
+                "disclaimer": poi.get("disclaimer", ""),
+                "photo_url": poi.get("photo_url", ""),
+                "coordinates": poi.get("coordinates", {})  # ✅ For future route optimization
+            }
+            itinerary[day_key].append(activity)
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("activities per day: %s (max %s, scheduler %s)",
+                     {d: len(itinerary[d]) for d in day_keys}, effective_max_per_day, ITINERARY_SCHEDULER)
+
+    # Fallback: Add placeholder if no hidden gems found
+    if enable_hidden_gems and not hidden_gems:
+        for day in reversed(day_keys):
+            if len(itinerary[day]) < effective_max_per_day:
+                itinerary[day].append({
+                    "name": "🔍 Hidden Gem (Coming Soon)",
+                    "tags": ["surprise", "offbeat"],
+                    "best_time": "Anytime",
+                    "disclaimer": "⏳ No hidden gems found for your interests in this location. Feature expanding!"
+                })
                 break
-                
-            # Add hidden gem if day has space (less than effective_max_per_day)
-            current_activities = len(itinerary[day_key])
-            print(f"   🔍 Checking {day_key}: {current_activities} activities, limit: {effective_max_per_day}")
-            
-            if current_activities < effective_max_per_day:
-                gem = hidden_gems[gem_index]
-                print(f"   ✨ Adding '{gem['name']}' to {day_key}")
-                itinerary[day_key].append(gem)
-                gem_index += 1
-            else:
-                print(f"   ❌ {day_key} is full ({current_activities}/{effective_max_per_day})")
-                
-        # If we still have unassigned gems, try to add them to days with the least activities
-        remaining_gems = hidden_gems[gem_index:]
-        if remaining_gems:
-            print(f"   🔄 Adding {len(remaining_gems)} remaining gems to least busy days...")
-            # Sort days by number of activities (ascending)
-            sorted_days = sorted(day_keys, key=lambda d: len(itinerary[d]))
-            print(f"   📊 Day activity counts: {[(d, len(itinerary[d])) for d in sorted_days]}")
-            
-            for gem in remaining_gems:
-                for day_key in sorted_days:
-                    if len(itinerary[day_key]) < effective_max_per_day:
-                        print(f"   ✨ Adding overflow gem '{gem['name']}' to {day_key}")
-                        itinerary[day_key].append(gem)
-                        break
-                else:
-                    print(f"   ❌ Could not find space for gem '{gem['name']}' - all days are full!")
-    else:
-        # Fallback: Add placeholder if no hidden gems found
-        if enable_hidden_gems:
-            for day in reversed(day_keys):
-                if len(itinerary[day]) < effective_max_per_day:
-                    itinerary[day].append({
-                        "name": "🔍 Hidden Gem (Coming Soon)",
-                        "tags": ["surprise", "offbeat"],
-                        "best_time": "Anytime",
-                        "disclaimer": "⏳ No hidden gems found for your interests in this location. Feature expanding!"
-                    })
-                    break
 
+    summary = {
+        "days": num_days,
+        "pois_in": len(filtered_pois),
+        "activities": sum(len(v) for v in itinerary.values()),
+        "gems_found": len(hidden_gems),
+        "gems_placed": gems_placed,
+        "gems_unplaced": len(hidden_gems) - gems_placed,
+        "max_per_day": effective_max_per_day,
+        "scheduler": ITINERARY_SCHEDULER,
+        "total_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    logger.info("itinerary %s", summary, extra={"summary": summary})
     return itinerary
 
 # ✅ Test functions - only run when file is executed directly
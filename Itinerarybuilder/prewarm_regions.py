@@ -0,0 +1,201 @@
+# prewarm_regions.py
+"""
+Offline region pre-warming so /itinerary/generate rarely hits the cold Google + BART path.
+
+For every location: fetch_places -> reviews -> tagging -> store_pois, with
+  - locations processed in parallel (threads; the stages are I/O bound)
+  - tagging on a process pool (each worker loads the model once)
+  - a checkpoint per location after every stage, so a crashed run resumes
+    where it stopped (finished locations are skipped unless --force)
+  - per-stage throughput reported at the end
+
+    python Itinerarybuilder/prewarm_regions.py Goa Jaipur Munnar
+    python Itinerarybuilder/prewarm_regions.py --file regions.txt --workers 4 --tag-processes 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+# Firestore/Google modules are imported inside prewarm_location: spawned tagging
+# workers re-import this script and should only load the model.
+from Itinerarybuilder.tag_worker import init_worker, tag_batch
+
+DEFAULT_CHECKPOINT_DIR = os.path.join("cache", "prewarm")
+STAGES = ("fetch", "reviews", "tag", "store")
+STAGE_UNITS = {"fetch": "places", "reviews": "places", "tag": "reviews", "store": "places"}
+
+
+class StageStats:
+    """Items processed and busy seconds per stage, summed over all locations."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.items = {stage: 0 for stage in STAGES}
+        self.seconds = {stage: 0.0 for stage in STAGES}
+
+    def add(self, stage, items, seconds):
+        with self._lock:
+            self.items[stage] += items
+            self.seconds[stage] += seconds
+
+    def report(self):
+        print(f"\n{'stage':>8} | {'items':>8} | {'busy s':>8} | {'items/s':>8}")
+        print("-" * 42)
+        for stage in STAGES:
+            secs = self.seconds[stage]
+            rate = self.items[stage] / secs if secs else 0.0
+            print(f"{stage:>8} | {self.items[stage]:>8} | {secs:>8.1f} | {rate:>8.1f}  ({STAGE_UNITS[stage]})")
+
+
+# -----------------------------
+# Checkpoints
+# -----------------------------
+def _checkpoint_path(checkpoint_dir, location):
+    slug = re.sub(r"[^a-z0-9]+", "-", location.lower()).strip("-")
+    return os.path.join(checkpoint_dir, f"{slug}.json")
+
+
+def _load_checkpoint(checkpoint_dir, location):
+    path = _checkpoint_path(checkpoint_dir, location)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        print(f"⚠️ Ignoring unreadable checkpoint {path}")
+        return {}
+
+
+def _save_checkpoint(checkpoint_dir, location, checkpoint):
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    path = _checkpoint_path(checkpoint_dir, location)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp, path)
+
+
+# -----------------------------
+# Per-location pipeline
+# -----------------------------
+def prewarm_location(location, stats, tag_pool=None, checkpoint_dir=DEFAULT_CHECKPOINT_DIR,
+                     max_results=100, force=False):
+    """Run the remaining stages for one location; returns "done" or "skipped"."""
+    from Itinerarybuilder.fetch_places import fetch_places
+    from Itinerarybuilder.get_reviews import get_reviews_for_places
+    from Itinerarybuilder.run_pipeline import enrich_places
+    from Itinerarybuilder.store_pois import store_pois
+
+    checkpoint = {} if force else _load_checkpoint(checkpoint_dir, location)
+    if checkpoint.get("stored"):
+        print(f"⏭️ {location}: already pre-warmed, skipping.")
+        return "skipped"
+    checkpoint["location"] = location
+
+    if "places" not in checkpoint:
+        t0 = time.perf_counter()
+        checkpoint["places"] = fetch_places(location, max_results=max_results)
+        stats.add("fetch", len(checkpoint["places"]), time.perf_counter() - t0)
+        _save_checkpoint(checkpoint_dir, location, checkpoint)
+    places = checkpoint["places"]
+
+    if "reviews" not in checkpoint:
+        t0 = time.perf_counter()
+        checkpoint["reviews"] = get_reviews_for_places([place["place_id"] for place in places])
+        stats.add("reviews", len(places), time.perf_counter() - t0)
+        _save_checkpoint(checkpoint_dir, location, checkpoint)
+    reviews_per_place = checkpoint["reviews"]
+
+    if "tags" not in checkpoint:
+        pairs = [(place["name"], reviews) for place, reviews in zip(places, reviews_per_place)]
+        t0 = time.perf_counter()
+        checkpoint["tags"] = tag_pool.submit(tag_batch, pairs).result() if tag_pool else tag_batch(pairs)
+        stats.add("tag", sum(len(r or []) for r in reviews_per_place), time.perf_counter() - t0)
+        _save_checkpoint(checkpoint_dir, location, checkpoint)
+
+    t0 = time.perf_counter()
+    enrich_places(places, reviews_per_place, checkpoint["tags"])
+    store_pois(location, places)
+    stats.add("store", len(places), time.perf_counter() - t0)
+    checkpoint["stored"] = True
+    _save_checkpoint(checkpoint_dir, location, checkpoint)
+    print(f"✅ {location}: {len(places)} places pre-warmed.")
+    return "done"
+
+
+def _read_locations(args):
+    locations = list(args.locations)
+    if args.file:
+        with open(args.file, "r") as f:
+            locations += [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return list(dict.fromkeys(locations))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-warm Firestore POIs for a list of locations.")
+    parser.add_argument("locations", nargs="*", help="locations to pre-warm")
+    parser.add_argument("--file", help="text file with one location per line")
+    parser.add_argument("--workers", type=int, default=4, help="locations processed in parallel")
+    parser.add_argument("--tag-processes", type=int, default=1,
+                        help="tagging worker processes (0 = tag in the calling thread)")
+    parser.add_argument("--max-results", type=int, default=100)
+    parser.add_argument("--checkpoint-dir", default=DEFAULT_CHECKPOINT_DIR)
+    parser.add_argument("--force", action="store_true", help="ignore existing checkpoints")
+    args = parser.parse_args(argv)
+
+    locations = _read_locations(args)
+    if not locations:
+        parser.error("no locations given")
+
+    stats = StageStats()
+    tag_pool = None
+    if args.tag_processes > 0:
+        # spawn: workers must not inherit the parent's Firestore/gRPC state
+        tag_pool = ProcessPoolExecutor(
+            max_workers=args.tag_processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=init_worker,
+        )
+
+    started = time.perf_counter()
+    outcomes = {"done": 0, "skipped": 0, "failed": 0}
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers, thread_name_prefix="prewarm") as pool:
+            futures = {
+                pool.submit(prewarm_location, location, stats, tag_pool, args.checkpoint_dir,
+                            args.max_results, args.force): location
+                for location in locations
+            }
+            for future in as_completed(futures):
+                try:
+                    outcomes[future.result()] += 1
+                except Exception as e:
+                    outcomes["failed"] += 1
+                    print(f"❌ {futures[future]}: {e} (progress kept in checkpoint, re-run to resume)")
+    finally:
+        if tag_pool:
+            tag_pool.shutdown()
+
+    elapsed = time.perf_counter() - started
+    stats.report()
+    print(f"\n📌 {outcomes['done']} done, {outcomes['skipped']} skipped, {outcomes['failed']} failed "
+          f"in {elapsed:.1f}s ({outcomes['done'] / elapsed * 60 if elapsed else 0:.1f} locations/min)")
+    return 1 if outcomes["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,11 @@
 import firebase_admin
 from firebase_admin import credentials, firestore
 from .utils.firebase_utils import get_service_account_path
+from .utils.poi_index import poi_index
 from google.api_core.exceptions import GoogleAPIError
 import datetime
+import hashlib
+import json
 
 # ✅ Initialize Firestore only once
 if not firebase_admin._apps:
@@ -13,13 +16,41 @@ if not firebase_admin._apps:
 
 db = firestore.client()
 
+# Refs per db.get_all round trip in the duplicate check
+EXISTENCE_CHECK_CHUNK = 100
+# Fields left out of content_hash (write metadata, not POI content)
+_HASH_EXCLUDED_FIELDS = {"created_at", "content_hash"}
+
+
+def poi_content_hash(poi):
+    """Stable hash of a POI's content, used to skip rewriting unchanged docs."""
+    content = {k: v for k, v in poi.items() if k not in _HASH_EXCLUDED_FIELDS}
+    payload = json.dumps(content, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _existing_hashes(poi_ref, place_ids):
+    """place_id -> stored content_hash (None for docs written before hashing), via batched reads."""
+    hashes = {}
+    round_trips = 0
+    for start in range(0, len(place_ids), EXISTENCE_CHECK_CHUNK):
+        refs = [poi_ref.document(pid) for pid in place_ids[start:start + EXISTENCE_CHECK_CHUNK]]
+        # Only the hash field comes back, not the whole document
+        for snap in db.get_all(refs, field_paths=["content_hash"]):
+            if snap.exists:
+                hashes[snap.id] = (snap.to_dict() or {}).get("content_hash")
+        round_trips += 1
+    return hashes, round_trips
+
+
 def store_pois(location, pois, batch_size=300):
     """
     Stores POIs under 'places/{location}/poi_list'.
-    ✅ Adds metadata (created_at, source).
-    ✅ Handles duplicates gracefully.
+    ✅ Adds metadata (created_at, source, content_hash).
+    ✅ Skips unchanged POIs by content hash, checked with batched reads.
     ✅ Uses batch commits for scalability.
     ✅ Fully compatible with run_pipeline, query_firestore, itinerary_builder.
+    Returns a summary dict (saved, skipped, reads).
     """
     # Normalize the location so collections are consistent
     location = location.lower()
@@ -27,11 +58,10 @@ def store_pois(location, pois, batch_size=300):
     poi_ref = db.collection("places").document(location).collection("poi_list")
     saved_count = 0
     skipped_count = 0
+    summary = {"saved": 0, "skipped": 0, "unchanged": 0, "read_round_trips": 0, "read_round_trips_saved": 0}
 
     try:
-        batch = db.batch()
-        ops_in_batch = 0
-
+        to_store = []
         for poi in pois:
             place_id = poi.get("place_id")
             if not place_id:
@@ -49,22 +79,31 @@ def store_pois(location, pois, batch_size=300):
             poi.setdefault("kid_friendly", None)
             poi.setdefault("pet_friendly", None)
             poi.setdefault("wheelchair_accessible", None)
-
-            # ✅ Add metadata
-            poi["created_at"] = datetime.datetime.utcnow().isoformat()
             poi.setdefault("source", "google_places")
+            to_store.append(poi)
 
-            doc_ref = poi_ref.document(place_id)
+        # ✅ One batched read per EXISTENCE_CHECK_CHUNK POIs instead of one get() each
+        place_ids = list(dict.fromkeys(poi["place_id"] for poi in to_store))
+        existing, round_trips = _existing_hashes(poi_ref, place_ids)
 
+        batch = db.batch()
+        ops_in_batch = 0
+        unchanged_count = 0
+
+        for poi in to_store:
             # ✅ Skip duplicates unless data has changed
-            existing_doc = doc_ref.get()
-            if existing_doc.exists:
-                existing_data = existing_doc.to_dict()
-                if existing_data == poi:
-                    skipped_count += 1
-                    continue
-
-            batch.set(doc_ref, poi)
+            content_hash = poi_content_hash(poi)
+            if existing.get(poi["place_id"]) == content_hash:
+                skipped_count += 1
+                unchanged_count += 1
+                continue
+
+            # ✅ Add metadata
+            poi["content_hash"] = content_hash
+            poi["created_at"] = datetime.datetime.utcnow().isoformat()
+            existing[poi["place_id"]] = content_hash
+
+            batch.set(poi_ref.document(poi["place_id"]), poi)
             saved_count += 1
             ops_in_batch += 1
 
@@ -78,9 +117,24 @@ def store_pois(location, pois, batch_size=300):
         if ops_in_batch > 0:
             batch.commit()
 
+        summary.update({
+            "saved": saved_count,
+            "skipped": skipped_count,
+            "unchanged": unchanged_count,
+            "read_round_trips": round_trips,
+            "read_round_trips_saved": len(place_ids) - round_trips,
+        })
         print(f"✅ Stored {saved_count} new POIs under 'places/{location}/poi_list' ({skipped_count} skipped/duplicates)")
+        print(f"🔎 Duplicate check: {len(place_ids)} POIs in {round_trips} batched reads "
+              f"({len(place_ids) - round_trips} round trips saved, {unchanged_count} unchanged by hash)")
 
     except GoogleAPIError as e:
         print(f"❌ Firestore API Error while storing POIs for {location}: {e}")
     except Exception as e:
         print(f"❌ Unexpected error while storing POIs for {location}: {e}")
+
+    # ✅ get_filtered_pois rebuilds this location's index on its next query (also after a partial write)
+    if saved_count:
+        poi_index.invalidate(location)
+
+    return summary
@@ -1,16 +1,33 @@
 
 # tag_reviews.py
 
-from transformers import pipeline
+import os
+
+import numpy as np
 from tqdm import tqdm
-import time
 
-# Load once globally
-classifier = pipeline(
-    "zero-shot-classification",
-    model="facebook/bart-large-mnli",
-    device=-1  # ✅ CPU now, switch to device=0 when moving to GPU
-)
+from utils.inference_backend import backend_for, cache_model_id, load_zero_shot_pipeline
+from utils.model_registry import model_registry
+from utils.tags_extractor import label_similarities
+from .utils.review_tag_cache import review_key, review_tag_cache
+
+MODEL_NAME = "facebook/bart-large-mnli"
+# fp32 | int8 | onnx (REVIEW_TAGGER_BACKEND, else TAGGER_BACKEND)
+BACKEND = backend_for("REVIEW_TAGGER_BACKEND")
+CACHE_MODEL_ID = cache_model_id(MODEL_NAME, BACKEND)
+
+
+def _load_classifier():
+    return load_zero_shot_pipeline(MODEL_NAME, BACKEND)
+
+
+# Loaded on first use (or by model_registry preload/warm-up), shared process-wide
+model_registry.register(MODEL_NAME, _load_classifier)
+
+
+def classifier(*args, **kwargs):
+    """Call the shared zero-shot pipeline, loading it on first use."""
+    return model_registry.get(MODEL_NAME)(*args, **kwargs)
 
 LABELS = [
     "romantic", "adventurous", "family-friendly", "spiritual", "sunset",
@@ -39,34 +56,32 @@ def has_kid_friendly_issues(reviews):
                 return True
     return False
 
-def tag_place_with_reviews(place_name, reviews, min_confidence=0.6, min_occurrences=2):
-    """
-    Assigns tags to a POI using BERT zero-shot classification.
-    Aggregates across reviews with a confidence and occurrence threshold.
-    """
-    if not reviews:
-        print(f"⚠️ No reviews available for {place_name}, skipping tagging.")
-        return []
+# "nli": BART zero-shot per review (reference). "embedding": MiniLM review/label
+# similarity, with NLI only re-ranking borderline labels when TAGGING_RERANK is on.
+TAGGING_MODES = ("nli", "embedding")
+TAGGING_MODE = os.getenv("TAGGING_MODE", "nli")
+TAGGING_RERANK = os.getenv("TAGGING_RERANK", "true").lower() == "true"
+# Review/label cosine similarity counted as a vote in embedding mode, and the
+# band around it treated as borderline
+EMBED_MIN_SIMILARITY = 0.35
+EMBED_BORDERLINE_MARGIN = 0.05
 
-    tag_scores = {}
-    tag_count = {}
+# Reviews per forward pass. The pipeline expands each review into one
+# premise/hypothesis pair per label, so the model sees batch_size * len(LABELS) rows.
+DEFAULT_BATCH_SIZE = 8
 
-    for review in tqdm(reviews, desc=f"Tagging {place_name}", leave=False):
-        review = review.strip()
-        if not review:
-            continue
 
-        # Run classification
-        result = classifier(review, LABELS, multi_label=True)
+def _aggregate_tags(results, min_confidence, min_occurrences):
+    """Sum scores >= min_confidence per label; keep labels seen in >= min_occurrences reviews."""
+    tag_scores = {}
+    tag_count = {}
 
-        # Aggregate scores
+    for result in results:
         for label, score in zip(result["labels"], result["scores"]):
             if score >= min_confidence:
                 tag_scores[label] = tag_scores.get(label, 0) + score
                 tag_count[label] = tag_count.get(label, 0) + 1
 
-        time.sleep(0.05)  # Small delay for rate-limiting safety in large batches
-
     # Apply minimum occurrence filter
     filtered_tags = {
         tag: score for tag, score in tag_scores.items()
@@ -79,6 +94,145 @@ def tag_place_with_reviews(place_name, reviews, min_confidence=0.6, min_occurren
     return final_tags
 
 
-#Cache tags in Firestore.
+def _nli_results(texts, batch_size, use_cache, desc):
+    """Zero-shot result per text, served from the review-tag cache where possible."""
+    keys = [review_key(text, LABELS, CACHE_MODEL_ID) for text in texts]
+    known = review_tag_cache.get_many(keys) if use_cache else {}
+
+    # Classify each distinct uncached review once
+    todo = {}
+    for i, key in enumerate(keys):
+        if key not in known and key not in todo:
+            todo[key] = i
+    if use_cache:
+        print(f"🗃️ Review-tag cache: {len(texts) - len(todo)}/{len(texts)} reviews cached, "
+              f"{len(todo)} to classify.")
+
+    fresh = {}
+    by_length = sorted(todo.values(), key=lambda i: len(texts[i]))
+    if by_length:
+        with tqdm(total=len(by_length), desc=desc, leave=False) as bar:
+            for start in range(0, len(by_length), batch_size):
+                chunk = by_length[start:start + batch_size]
+                results = classifier(
+                    [texts[i] for i in chunk], LABELS, multi_label=True, batch_size=batch_size * len(LABELS)
+                )
+                if isinstance(results, dict):  # a single input comes back unwrapped
+                    results = [results]
+                for i, result in zip(chunk, results):
+                    fresh[keys[i]] = result
+                bar.update(len(chunk))
+
+        if use_cache:
+            review_tag_cache.put_many(CACHE_MODEL_ID, fresh.items())
+
+    return [known.get(key) or fresh[key] for key in keys]
+
+
+def _embedding_tags(reviews, sims, min_occurrences, rerank, batch_size, min_confidence):
+    """
+    Tags for one place from its review x label similarity matrix.
+
+    A label needs min_occurrences reviews at or above EMBED_MIN_SIMILARITY.
+    Labels that clear the bar only inside +-EMBED_BORDERLINE_MARGIN are
+    borderline: with rerank they are settled by the NLI model (on those
+    labels only), otherwise by the plain threshold.
+    """
+    hi = (sims >= EMBED_MIN_SIMILARITY + EMBED_BORDERLINE_MARGIN).sum(axis=0)
+    mid = (sims >= EMBED_MIN_SIMILARITY).sum(axis=0)
+    lo = (sims >= EMBED_MIN_SIMILARITY - EMBED_BORDERLINE_MARGIN).sum(axis=0)
+    scores = np.where(sims >= EMBED_MIN_SIMILARITY, sims, 0.0).sum(axis=0)
+
+    accepted = [j for j in range(len(LABELS)) if hi[j] >= min_occurrences]
+    borderline = [j for j in range(len(LABELS)) if hi[j] < min_occurrences <= lo[j]]
+
+    if borderline and rerank:
+        results = classifier(
+            reviews, [LABELS[j] for j in borderline], multi_label=True,
+            batch_size=batch_size * len(borderline)
+        )
+        if isinstance(results, dict):
+            results = [results]
+        confirmed = set(_aggregate_tags(results, min_confidence, min_occurrences))
+        accepted += [j for j in borderline if LABELS[j] in confirmed]
+    else:
+        accepted += [j for j in borderline if mid[j] >= min_occurrences]
+
+    accepted.sort(key=lambda j: scores[j], reverse=True)
+    return [LABELS[j] for j in accepted]
+
+
+def tag_places_with_reviews(places, batch_size=DEFAULT_BATCH_SIZE, min_confidence=0.6, min_occurrences=2,
+                            use_cache=True, mode=None, rerank=None):
+    """
+    Batched version of ``tag_place_with_reviews`` for many places at once.
+
+    ``places`` is a list of ``(place_name, reviews)`` pairs. All reviews of all
+    places are classified together in padded mini-batches of ``batch_size``
+    reviews (sorted by length to keep padding low), then aggregated per place
+    with the same thresholds. Returns one tag list per place, in input order.
+
+    With ``use_cache`` only reviews missing from the on-disk review-tag cache
+    are classified; unchanged places are re-tagged without touching the model.
+
+    ``mode="embedding"`` (default: TAGGING_MODE) scores reviews against the
+    MiniLM label embeddings instead, in one encode call, and only runs NLI
+    to re-rank borderline labels (``rerank``, default: TAGGING_RERANK).
+    """
+    mode = mode or TAGGING_MODE
+    if mode not in TAGGING_MODES:
+        raise ValueError(f"Unknown tagging mode '{mode}'")
+    rerank = TAGGING_RERANK if rerank is None else rerank
+
+    texts = []
+    owners = []
+    for place_idx, (place_name, reviews) in enumerate(places):
+        cleaned = [r.strip() for r in (reviews or []) if r and r.strip()]
+        if not cleaned:
+            print(f"⚠️ No reviews available for {place_name}, skipping tagging.")
+        texts.extend(cleaned)
+        owners.extend([place_idx] * len(cleaned))
+
+    if not texts:
+        return [[] for _ in places]
+
+    if mode == "embedding":
+        sims = label_similarities(texts, LABELS)
+        owners = np.asarray(owners)
+        tags = []
+        for place_idx in range(len(places)):
+            rows = np.flatnonzero(owners == place_idx)
+            if not len(rows):
+                tags.append([])
+                continue
+            tags.append(_embedding_tags(
+                [texts[i] for i in rows], sims[rows], min_occurrences, rerank, batch_size, min_confidence
+            ))
+        return tags
+
+    per_place = [[] for _ in places]
+    for owner, result in zip(owners, _nli_results(texts, batch_size, use_cache, f"Tagging {len(places)} places")):
+        per_place[owner].append(result)
+
+    return [_aggregate_tags(results, min_confidence, min_occurrences) for results in per_place]
+
+
+def tag_place_with_reviews(place_name, reviews, min_confidence=0.6, min_occurrences=2, use_cache=True,
+                           mode=None, rerank=None):
+    """
+    Assigns tags to a POI using BERT zero-shot classification.
+    Aggregates across reviews with a confidence and occurrence threshold.
+    """
+    if not reviews:
+        print(f"⚠️ No reviews available for {place_name}, skipping tagging.")
+        return []
+
+    return tag_places_with_reviews(
+        [(place_name, reviews)],
+        min_confidence=min_confidence,
+        min_occurrences=min_occurrences,
+        use_cache=use_cache,
+        mode=mode,
+        rerank=rerank,
+    )[0]
 
-#Only re-run tagging if reviews changed.
\ No newline at end of file
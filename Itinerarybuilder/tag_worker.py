@@ -0,0 +1,16 @@
+# tag_worker.py
+#
+# Entry points for tagging in a separate process (prewarm_regions' process pool).
+# Kept free of Firestore imports so spawned workers only load the tagging model.
+
+def init_worker():
+    """Load the review classifier once per worker process."""
+    from Itinerarybuilder.tag_reviews import MODEL_NAME
+    from utils.model_registry import model_registry
+    model_registry.preload([MODEL_NAME])
+
+
+def tag_batch(places):
+    """tag_places_with_reviews for a list of (place_name, reviews) pairs."""
+    from Itinerarybuilder.tag_reviews import tag_places_with_reviews
+    return tag_places_with_reviews(places)
@@ -0,0 +1,107 @@
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Background refreshes run here, never on the request thread
+REFRESH_WORKERS = int(os.getenv("CACHE_REFRESH_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=REFRESH_WORKERS, thread_name_prefix="cache-refresh")
+
+
+class StaleWhileRevalidate:
+    """
+    Stale-while-revalidate reads over a SQLiteCache.
+
+      fresh (age <= ttl)                 -> served
+      stale (ttl < age <= ttl+max_stale) -> served immediately, refreshed in the background
+      missing / too old                  -> fetched inline and stored
+
+    The fetch callable returns the value to cache, or None for results that
+    must not be cached (API errors); a failed refresh keeps the stale entry.
+    Refreshes are de-duplicated per key within the process.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self.fresh_hits = 0
+        self.stale_served = 0
+        self.misses = 0
+        self.refreshes_ok = 0
+        self.refreshes_failed = 0
+        self.refreshes_skipped = 0
+        self._lag_total = 0.0
+        self.max_lag_seconds = 0.0
+
+    def get_or_fetch(self, key, fetch):
+        entry = self.cache.get_entry(key)
+        if entry is not None:
+            value, stored_at = entry
+            if self.cache.is_fresh(stored_at):
+                with self._lock:
+                    self.fresh_hits += 1
+                return value
+            if self.cache.is_servable(stored_at):
+                with self._lock:
+                    self.stale_served += 1
+                self._schedule_refresh(key, fetch, stored_at)
+                return value
+
+        with self._lock:
+            self.misses += 1
+        value = fetch()
+        if value is not None:
+            self.cache.set(key, value)
+        return value
+
+    def _schedule_refresh(self, key, fetch, stored_at):
+        with self._lock:
+            if key in self._refreshing:
+                self.refreshes_skipped += 1
+                return
+            self._refreshing.add(key)
+        _executor.submit(self._refresh, key, fetch, stored_at)
+
+    def _refresh(self, key, fetch, stored_at):
+        try:
+            value = fetch()
+            if value is None:
+                with self._lock:
+                    self.refreshes_failed += 1
+                return
+            self.cache.set(key, value)
+        except Exception:
+            with self._lock:
+                self.refreshes_failed += 1
+            return
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+        # How long past its TTL the entry was before fresh data landed
+        lag = max(0.0, time.time() - (stored_at + (self.cache.ttl_seconds or 0)))
+        with self._lock:
+            self.refreshes_ok += 1
+            self._lag_total += lag
+            self.max_lag_seconds = max(self.max_lag_seconds, lag)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.fresh_hits + self.stale_served + self.misses
+            return {
+                "cache": self.cache.name,
+                "ttl_seconds": self.cache.ttl_seconds,
+                "max_stale_seconds": self.cache.max_stale_seconds,
+                "fresh_hits": self.fresh_hits,
+                "stale_served": self.stale_served,
+                "misses": self.misses,
+                "hit_rate": round((self.fresh_hits + self.stale_served) / lookups, 4) if lookups else 0.0,
+                "refreshes_in_flight": len(self._refreshing),
+                "refreshes_ok": self.refreshes_ok,
+                "refreshes_failed": self.refreshes_failed,
+                "refreshes_deduplicated": self.refreshes_skipped,
+                "avg_refresh_lag_seconds": round(self._lag_total / self.refreshes_ok, 1) if self.refreshes_ok else None,
+                "max_refresh_lag_seconds": round(self.max_lag_seconds, 1),
+            }
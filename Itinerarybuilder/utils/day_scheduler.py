@@ -0,0 +1,201 @@
+# utils/day_scheduler.py
+#
+# Assigns itinerary items (regular POIs + hidden gems) to days.
+#
+#   "clustered":  k-means on the POI coordinates (k = number of days, deterministic
+#                 farthest-point init), then a capacity-aware assignment that
+#                 pops (distance, item, day) pairs off a priority queue - POIs
+#                 into their regular slots, then gems into what is left - so every
+#                 day is one geographic area and no day exceeds its slots.
+#   "sequential": the original fill order - regular POIs day by day in input
+#                 order, then gems into days with a free slot.
+#
+# Both return day -> item indices and never use randomness, so the same input
+# always gives the same itinerary.
+
+import heapq
+import math
+
+import numpy as np
+
+SCHEDULER_MODES = ("clustered", "sequential")
+KMEANS_MAX_ITERS = 30
+# Re-center + re-assign rounds of the capacitated assignment
+ASSIGN_ROUNDS = 5
+
+
+def coords_of(item):
+    """(lat, lng) from an item's coordinates dict, or None if missing/invalid."""
+    coords = item.get("coordinates") or {}
+    try:
+        lat, lng = float(coords["lat"]), float(coords["lng"])
+    except (KeyError, TypeError, ValueError):
+        return None
+    if math.isnan(lat) or math.isnan(lng):
+        return None
+    return lat, lng
+
+
+def _project_km(points):
+    """Equirectangular projection to km around the points' mean latitude (fine at city/state scale)."""
+    pts = np.asarray(points, dtype=np.float64)
+    lat0 = math.radians(pts[:, 0].mean())
+    return np.column_stack((pts[:, 1] * 111.32 * math.cos(lat0), pts[:, 0] * 110.57))
+
+
+def _farthest_point_init(xy, k):
+    """First center nearest the mean, then repeatedly the point farthest from all chosen centers."""
+    chosen = [int(np.argmin(((xy - xy.mean(axis=0)) ** 2).sum(axis=1)))]
+    nearest = ((xy - xy[chosen[0]]) ** 2).sum(axis=1)
+    while len(chosen) < k:
+        nxt = int(np.argmax(nearest))
+        chosen.append(nxt)
+        nearest = np.minimum(nearest, ((xy - xy[nxt]) ** 2).sum(axis=1))
+    return xy[chosen].copy()
+
+
+def kmeans(xy, k, max_iters=KMEANS_MAX_ITERS):
+    """Lloyd's k-means with a deterministic init; returns centers (k, 2)."""
+    centers = _farthest_point_init(xy, k)
+    for _ in range(max_iters):
+        labels = np.argmin(((xy[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+        moved = centers.copy()
+        for c in range(k):
+            members = xy[labels == c]
+            if len(members):
+                moved[c] = members.mean(axis=0)
+        if np.allclose(moved, centers):
+            break
+        centers = moved
+    return centers
+
+
+def _assign_capacitated(xy, items, centers, room, num_days):
+    """
+    Greedy capacity-aware assignment: pop the globally closest (distance, item, day)
+    pair off a priority queue and take it if the item is free and the day has room.
+    Days without a center (more days than clusters) sort last as fallbacks.
+    room[day] is decremented in place; returns item -> day.
+    """
+    dist = np.full((len(items), num_days), np.inf)
+    dist[:, :len(centers)] = np.sqrt(((xy[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2))
+    heap = [(dist[row, day], item, day) for row, item in enumerate(items) for day in range(num_days)]
+    heapq.heapify(heap)
+
+    day_of = {}
+    while heap and len(day_of) < len(items):
+        _, item, day = heapq.heappop(heap)
+        if item in day_of or room[day] <= 0:
+            continue
+        room[day] -= 1
+        day_of[item] = day
+    return day_of
+
+
+def _fill_least_loaded(days, items, room):
+    """Place items (no coordinates) on the least-loaded days with room, via a priority queue on load."""
+    load = [(len(days[d]), d) for d in range(len(days)) if room[d] > 0]
+    heapq.heapify(load)
+    for item in items:
+        if not load:
+            break
+        count, day = heapq.heappop(load)
+        days[day].append(item)
+        room[day] -= 1
+        if room[day] > 0:
+            heapq.heappush(load, (count + 1, day))
+
+
+def _clustered(points, is_gem, selected, num_days, regular_cap, total_cap):
+    regular = [i for i in selected if not is_gem[i]]
+    gems = [i for i in selected if is_gem[i]]
+    days = [[] for _ in range(num_days)]
+
+    # 1. Cluster the located regular POIs (or the gems, if no POI has coordinates)
+    seeds = [i for i in regular if points[i] is not None] or [i for i in gems if points[i] is not None]
+    centers = np.zeros((0, 2))
+    if seeds:
+        xy_all = _project_km([points[i] for i in selected if points[i] is not None])
+        row_of = {item: row for row, item in enumerate(i for i in selected if points[i] is not None)}
+        centers = kmeans(xy_all[[row_of[i] for i in seeds]], min(num_days, len(seeds)))
+
+    # 2. Regular POIs: capacitated assignment, re-centered a few rounds
+    located = [i for i in regular if points[i] is not None]
+    if located:
+        xy = xy_all[[row_of[i] for i in located]]
+        for _ in range(ASSIGN_ROUNDS):
+            day_of = _assign_capacitated(xy, located, centers, [regular_cap] * num_days, num_days)
+            labels = np.array([day_of[i] for i in located])
+            moved = np.array([xy[labels == c].mean(axis=0) if (labels == c).any() else centers[c]
+                              for c in range(len(centers))])
+            if np.allclose(moved, centers):
+                break
+            centers = moved
+        for item in located:
+            days[day_of[item]].append(item)
+    room = [regular_cap - len(day) for day in days]
+    _fill_least_loaded(days, [i for i in regular if points[i] is None], room)
+
+    # 3. Gems take the remaining slots, nearest cluster first
+    room = [total_cap - len(day) for day in days]
+    located = [i for i in gems if points[i] is not None]
+    if located:
+        day_of = _assign_capacitated(xy_all[[row_of[i] for i in located]], located, centers, room, num_days)
+        for item in located:
+            days[day_of[item]].append(item)
+    _fill_least_loaded(days, [i for i in gems if points[i] is None], room)
+
+    # Days follow their best-ranked item; inside a day, input order (regular POIs before gems)
+    for day in days:
+        day.sort()
+    days.sort(key=lambda d: d[0] if d else math.inf)
+    return days
+
+
+def _sequential(is_gem, selected, num_days, regular_cap, total_cap):
+    days = [[] for _ in range(num_days)]
+    regular = [i for i in selected if not is_gem[i]]
+    for pos, item in enumerate(regular):
+        days[pos // regular_cap].append(item)
+    gems = [i for i in selected if is_gem[i]]
+    # one gem per day with room, then the rest into the least busy days
+    remaining = []
+    for gem in gems:
+        target = next((d for d in range(num_days) if len(days[d]) < total_cap and not any(is_gem[i] for i in days[d])), None)
+        if target is None:
+            remaining.append(gem)
+        else:
+            days[target].append(gem)
+    for gem in remaining:
+        target = min((d for d in range(num_days) if len(days[d]) < total_cap), key=lambda d: (len(days[d]), d), default=None)
+        if target is not None:
+            days[target].append(gem)
+    return days
+
+
+def schedule_days(pois, gems, num_days, regular_per_day, max_per_day, mode="clustered"):
+    """
+    Pick and place items for a num_days trip.
+
+    Regular POIs keep their ranking: only the first num_days * regular_per_day are
+    used, as before. Gems fill whatever capacity is left (max_per_day per day in
+    total). Returns a list of num_days lists of (kind, index) with kind "poi"/"gem".
+    """
+    if mode not in SCHEDULER_MODES:
+        raise ValueError(f"Unknown scheduler mode '{mode}'")
+    if num_days <= 0 or max_per_day <= 0:
+        return [[] for _ in range(max(num_days, 0))]
+    regular_cap = max(0, min(regular_per_day, max_per_day))
+
+    items = [("poi", i) for i in range(min(len(pois), num_days * regular_cap))]
+    free = num_days * max_per_day - len(items)
+    items += [("gem", i) for i in range(min(len(gems), free))]
+    is_gem = [kind == "gem" for kind, _ in items]
+    points = [coords_of(pois[i] if kind == "poi" else gems[i]) for kind, i in items]
+    selected = list(range(len(items)))
+
+    if mode == "sequential":
+        days = _sequential(is_gem, selected, num_days, max(regular_cap, 1), max_per_day)
+    else:
+        days = _clustered(points, is_gem, selected, num_days, regular_cap, max_per_day)
+    return [[items[i] for i in day] for day in days]
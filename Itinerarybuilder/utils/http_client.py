@@ -0,0 +1,122 @@
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Base URL for Google Maps web services; point it at a local stub server in tests/benchmarks
+GOOGLE_API_BASE_URL = os.getenv("GOOGLE_API_BASE_URL", "https://maps.googleapis.com").rstrip("/")
+
+# At most this many requests in flight per host (also the pooled connections per host)
+MAX_PER_HOST = int(os.getenv("HTTP_MAX_PER_HOST", "8"))
+MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+DEFAULT_TIMEOUT = 10
+
+RETRY_HTTP_STATUSES = {429, 500, 502, 503, 504}
+# Google reports quota exhaustion as HTTP 200 with this body status
+RATE_LIMIT_API_STATUSES = {"OVER_QUERY_LIMIT"}
+
+_lock = threading.Lock()
+_session = None
+_host_slots = {}
+# host -> monotonic time before which nobody should call it (set on 429 / OVER_QUERY_LIMIT)
+_host_cooldown = {}
+
+
+def google_url(path):
+    """Absolute URL for a Google Maps API path such as '/maps/api/place/details/json'."""
+    return f"{GOOGLE_API_BASE_URL}{path}"
+
+
+def get_session():
+    """Process-wide requests.Session with keep-alive pooling (one TLS handshake per connection)."""
+    global _session
+    with _lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=16, pool_maxsize=MAX_PER_HOST)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def _slot(host):
+    with _lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(MAX_PER_HOST)
+        return _host_slots[host]
+
+
+def _backoff(attempt, retry_after=None):
+    if retry_after is not None:
+        return min(BACKOFF_MAX_SECONDS, retry_after)
+    delay = min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return delay * (0.5 + random.random() / 2)  # jitter so parallel callers spread out
+
+
+def _cool_down(host, seconds):
+    with _lock:
+        _host_cooldown[host] = max(_host_cooldown.get(host, 0.0), time.monotonic() + seconds)
+
+
+def _wait_for_host(host):
+    wait = _host_cooldown.get(host, 0.0) - time.monotonic()
+    if wait > 0:
+        time.sleep(wait)
+
+
+def _retry_after_seconds(response):
+    value = response.headers.get("Retry-After")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+def get_json(url, params=None, timeout=DEFAULT_TIMEOUT, max_retries=MAX_RETRIES):
+    """
+    GET a JSON endpoint through the pooled session.
+
+    Limits concurrency per host, retries connection errors, 429/5xx and
+    Google's OVER_QUERY_LIMIT with exponential backoff (honouring
+    Retry-After), and pauses every caller of a host while it is rate limited.
+    Raises requests.exceptions.RequestException once retries are exhausted;
+    a body that is still OVER_QUERY_LIMIT is returned for the caller to handle.
+    """
+    host = urlsplit(url).netloc
+    session = get_session()
+    slot = _slot(host)
+
+    for attempt in range(max_retries + 1):
+        last_try = attempt == max_retries
+        _wait_for_host(host)
+        try:
+            with slot:
+                response = session.get(url, params=params, timeout=timeout)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if last_try:
+                raise
+            time.sleep(_backoff(attempt))
+            continue
+
+        if response.status_code in RETRY_HTTP_STATUSES and not last_try:
+            delay = _backoff(attempt, _retry_after_seconds(response))
+            if response.status_code == 429:
+                _cool_down(host, delay)
+            time.sleep(delay)
+            continue
+        response.raise_for_status()
+
+        data = response.json()
+        if data.get("status") in RATE_LIMIT_API_STATUSES and not last_try:
+            delay = _backoff(attempt)
+            _cool_down(host, delay)
+            time.sleep(delay)
+            continue
+        return data
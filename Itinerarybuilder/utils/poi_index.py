@@ -0,0 +1,192 @@
+import os
+import threading
+import time
+
+# Rebuild after this long even without a local store_pois write (other workers may have written)
+POI_INDEX_TTL_SECONDS = int(os.getenv("POI_INDEX_TTL_SECONDS", "600"))
+
+
+def _iter_bits(bits):
+    """Indices of the set bits of an int bitset, ascending."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class LocationPoiIndex:
+    """
+    In-memory index over one location's poi_list.
+
+    POIs are numbered in stream order; every filterable property is an int
+    bitset over those numbers (bit i = POI i), so a query is a handful of
+    AND/OR operations instead of a scan over every document.
+    """
+
+    def __init__(self, location, docs):
+        self.location = location
+        self.built_at = time.time()
+        self.pois = []
+        self.by_tag = {}
+        self.by_budget = {}
+        self.family_friendly = 0
+        self.kid_false = 0
+        self.kid_true = 0
+        self.pet_false = 0
+        self.wheelchair_false = 0
+
+        for i, data in enumerate(docs):
+            bit = 1 << i
+
+            # ✅ Normalize fields to avoid KeyErrors
+            data.setdefault("tags", [])
+            data.setdefault("budget_category", "unknown")
+            data.setdefault("kid_friendly", None)
+            data.setdefault("pet_friendly", None)
+            data.setdefault("wheelchair_accessible", None)
+            data.setdefault("disclaimer", "")
+            data.setdefault("photo_url", "")
+            data.setdefault("types", [])
+            data.setdefault("coordinates", {})
+            self.pois.append(data)
+
+            for tag in set(data["tags"]):
+                self.by_tag[tag] = self.by_tag.get(tag, 0) | bit
+            budget = data["budget_category"]
+            self.by_budget[budget] = self.by_budget.get(budget, 0) | bit
+
+            if "family-friendly" in [tag.lower() for tag in data["tags"]]:
+                self.family_friendly |= bit
+            if data["kid_friendly"] is False:
+                self.kid_false |= bit
+            elif data["kid_friendly"] is True:
+                self.kid_true |= bit
+            if data["pet_friendly"] is False:
+                self.pet_false |= bit
+            if data["wheelchair_accessible"] is False:
+                self.wheelchair_false |= bit
+
+        self.all = (1 << len(self.pois)) - 1
+
+    def match(self, user_tags, user_budget):
+        """Bitset of POIs passing the budget and interest-tag filters."""
+        bits = self.all
+
+        # ✅ Budget filter (only reject if explicitly mismatched)
+        if user_budget != "unknown":
+            bits &= self.by_budget.get(user_budget, 0) | self.by_budget.get("unknown", 0)
+
+        # ✅ Tag-based filtering (intersection with user interests)
+        if user_tags:
+            tagged = 0
+            for tag in user_tags:
+                tagged |= self.by_tag.get(tag, 0)
+            bits &= tagged
+        return bits
+
+    def filter(self, user_input):
+        """Same result as the old full scan: matching POIs (copies) with per-user disclaimers."""
+        user_tags = set(user_input.get("selected_interests", []))
+        user_budget = user_input.get("budget", "unknown")
+        bits = self.match(user_tags, user_budget)
+
+        kid_caution = self.kid_false & ~self.family_friendly
+        kid_ok = (self.kid_true | self.family_friendly) & ~kid_caution
+        pet_warning = self.pet_false if user_input.get("with_pets") else 0
+        wheelchair_warning = self.wheelchair_false if user_input.get("with_disabilities") else 0
+
+        results = []
+        for i in _iter_bits(bits):
+            bit = 1 << i
+
+            # ✅ Accessibility disclaimers (do NOT reject, only mark warnings)
+            disclaimer = []
+            if kid_caution & bit:
+                disclaimer.append("⚠️ Caution: may not be kid friendly")
+            elif kid_ok & bit:
+                disclaimer.append("✅ Suitable for kids")
+            if pet_warning & bit:
+                disclaimer.append("⚠️ No pets allowed")
+            if wheelchair_warning & bit:
+                disclaimer.append("⚠️ Not wheelchair accessible")
+
+            poi = dict(self.pois[i])
+            poi["disclaimer"] = " | ".join(disclaimer) if disclaimer else ""
+            results.append(poi)
+        return results
+
+
+class PoiIndexRegistry:
+    """location -> LocationPoiIndex, built from one collection stream and dropped on writes."""
+
+    def __init__(self, ttl_seconds=POI_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._indexes = {}
+        self._build_locks = {}
+        # Bumped by invalidate() (per location, and _epoch for all) so a build that
+        # started before a store_pois write is not kept afterwards
+        self._generations = {}
+        self._epoch = 0
+        self.builds = 0
+        self.discarded_builds = 0
+        self.hits = 0
+        self.invalidations = 0
+
+    def get(self, location, load_docs):
+        """Index for `location`; load_docs() streams the poi_list when a (re)build is needed."""
+        index = self._fresh(location)
+        if index is not None:
+            return index
+
+        with self._lock:
+            build_lock = self._build_locks.setdefault(location, threading.Lock())
+        with build_lock:
+            # another thread may have built it while we waited
+            index = self._fresh(location)
+            if index is not None:
+                return index
+            with self._lock:
+                generation = (self._epoch, self._generations.get(location, 0))
+            index = LocationPoiIndex(location, load_docs())
+            with self._lock:
+                self.builds += 1
+                if (self._epoch, self._generations.get(location, 0)) == generation:
+                    self._indexes[location] = index
+                else:
+                    # still answers this query; the next one rebuilds with the new writes
+                    self.discarded_builds += 1
+            return index
+
+    def _fresh(self, location):
+        with self._lock:
+            index = self._indexes.get(location)
+            if index is not None and time.time() - index.built_at <= self.ttl_seconds:
+                self.hits += 1
+                return index
+        return None
+
+    def invalidate(self, location=None):
+        """Drop one location's index (or all); the next query rebuilds it."""
+        with self._lock:
+            if location is None:
+                self._indexes.clear()
+                self._epoch += 1
+            else:
+                self._indexes.pop(location, None)
+                self._generations[location] = self._generations.get(location, 0) + 1
+            self.invalidations += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                "locations": {loc: len(idx.pois) for loc, idx in self._indexes.items()},
+                "builds": self.builds,
+                "discarded_builds": self.discarded_builds,
+                "hits": self.hits,
+                "invalidations": self.invalidations,
+            }
+
+
+# Shared by query_firestore (reads) and store_pois (invalidation)
+poi_index = PoiIndexRegistry()
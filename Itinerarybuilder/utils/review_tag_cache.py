@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+# Default location: Itinerarybuilder/cache/review_tags.sqlite3 (override with REVIEW_TAG_CACHE_PATH)
+DEFAULT_CACHE_PATH = Path(__file__).resolve().parents[1] / "cache" / "review_tags.sqlite3"
+
+# SQLite caps bound parameters per statement; stay well below it
+_LOOKUP_CHUNK = 500
+
+
+def review_key(text, labels, model_name):
+    """sha256 over (model, label set, review text); any change re-classifies the review."""
+    h = hashlib.sha256()
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\x00")
+    h.update("\x1f".join(labels).encode("utf-8"))
+    h.update(b"\x00")
+    h.update(text.encode("utf-8"))
+    return h.hexdigest()
+
+
+class ReviewTagCache:
+    """
+    On-disk map of review hash -> zero-shot result ({"labels": [...], "scores": [...]}).
+
+    One SQLite file shared by every process using it; lookups and writes are
+    batched so a place (or a whole tagging batch) costs one round trip.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or os.getenv("REVIEW_TAG_CACHE_PATH") or DEFAULT_CACHE_PATH)
+        self._conn = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    def _connect(self):
+        if self._conn is None:
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS review_tags ("
+                " key TEXT PRIMARY KEY,"
+                " model TEXT NOT NULL,"
+                " result TEXT NOT NULL,"
+                " created_at REAL NOT NULL DEFAULT (strftime('%s','now'))"
+                ")"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(self, keys):
+        """Return {key: result} for the keys that are cached; counts hits/misses."""
+        wanted = list(dict.fromkeys(keys))
+        found = {}
+        with self._lock:
+            conn = self._connect()
+            for start in range(0, len(wanted), _LOOKUP_CHUNK):
+                chunk = wanted[start:start + _LOOKUP_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, result FROM review_tags WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, result in rows:
+                    found[key] = json.loads(result)
+            self.hits += sum(1 for k in keys if k in found)
+            self.misses += sum(1 for k in keys if k not in found)
+        return found
+
+    def put_many(self, model_name, items):
+        """Store an iterable of (key, result) pairs."""
+        rows = [(key, model_name, json.dumps({"labels": r["labels"], "scores": r["scores"]}))
+                for key, r in items]
+        if not rows:
+            return
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO review_tags (key, model, result) VALUES (?, ?, ?)", rows
+            )
+            conn.commit()
+            self.writes += len(rows)
+
+    def stats(self):
+        """Hit/miss/write counts since start (or clear()) and the lookup hit rate, for /itinerary/cache-stats."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            entries = self._connect().execute("SELECT COUNT(*) FROM review_tags").fetchone()[0]
+            return {
+                "path": self.path,
+                "entries": entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "writes": self.writes,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM review_tags")
+            conn.commit()
+            self.hits = self.misses = self.writes = 0
+
+
+# Shared by tag_place_with_reviews / tag_places_with_reviews
+review_tag_cache = ReviewTagCache()
@@ -0,0 +1,172 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# One SQLite file (WAL mode) holds every named cache as its own table
+DEFAULT_CACHE_PATH = os.getenv("GOOGLE_CACHE_PATH", os.path.join("cache", "google_cache.sqlite3"))
+
+# Size bound is enforced every this many writes, not on each one
+_EVICT_EVERY = 100
+# accessed_at (used for LRU eviction) is refreshed at most this often per key
+_TOUCH_RESOLUTION_SECONDS = 300
+
+
+class SQLiteCache:
+    """
+    Persistent key -> JSON value cache with TTL and LRU size bound.
+
+    Backed by one table in a WAL-mode SQLite file, so any number of threads
+    and worker processes can read concurrently while one writes; every read
+    and write touches a single row instead of rewriting the whole cache.
+    Connections are per (process, thread), which keeps it fork-safe.
+
+    ``max_stale_seconds`` keeps expired rows around that long past their TTL
+    so they can still be served stale (see cache_refresh); None keeps them
+    until LRU eviction.
+
+    ``legacy_json`` is imported once into an empty table (the old whole-file
+    JSON caches), so switching backends does not start cold.
+    """
+
+    def __init__(self, name, ttl_seconds=None, max_entries=None, path=None, legacy_json=None,
+                 max_stale_seconds=0):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_entries = max_entries
+        self.path = path or DEFAULT_CACHE_PATH
+        self.legacy_json = legacy_json
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialized_pid = None
+        self._writes = 0
+
+    # -----------------------------
+    # Connection / schema
+    # -----------------------------
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        self._local.conn = conn
+        self._local.pid = os.getpid()
+
+        with self._init_lock:
+            if self._initialized_pid != os.getpid():
+                self._create_table(conn)
+                self._initialized_pid = os.getpid()
+        return conn
+
+    def _create_table(self, conn):
+        conn.execute(
+            f'CREATE TABLE IF NOT EXISTS "{self.name}" ('
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL"
+            ")"
+        )
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "{self.name}_accessed" ON "{self.name}" (accessed_at)')
+        if self.legacy_json and os.path.exists(self.legacy_json):
+            self._import_legacy(conn)
+
+    def _import_legacy(self, conn):
+        if conn.execute(f'SELECT 1 FROM "{self.name}" LIMIT 1').fetchone():
+            return
+        try:
+            with open(self.legacy_json, "r") as f:
+                legacy = json.load(f)
+        except Exception:
+            return
+        now = time.time()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                f'INSERT OR IGNORE INTO "{self.name}" (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)',
+                [(k, json.dumps(v), now, now) for k, v in legacy.items()],
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # -----------------------------
+    # Public API
+    # -----------------------------
+    def get_entry(self, key):
+        """(value, stored_at) regardless of age, or None if the key is absent."""
+        conn = self._conn()
+        row = conn.execute(
+            f'SELECT value, stored_at, accessed_at FROM "{self.name}" WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, stored_at, accessed_at = row
+        now = time.time()
+        if now - accessed_at > _TOUCH_RESOLUTION_SECONDS:
+            conn.execute(f'UPDATE "{self.name}" SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(value), stored_at
+
+    def is_fresh(self, stored_at):
+        return self.ttl_seconds is None or time.time() - stored_at <= self.ttl_seconds
+
+    def is_servable(self, stored_at):
+        """Within TTL plus the stale window."""
+        if self.ttl_seconds is None or self.max_stale_seconds is None:
+            return True
+        return time.time() - stored_at <= self.ttl_seconds + self.max_stale_seconds
+
+    def get(self, key, default=None):
+        """Cached value if present and within TTL, else default."""
+        entry = self.get_entry(key)
+        if entry is None or not self.is_fresh(entry[1]):
+            return default
+        return entry[0]
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def set(self, key, value):
+        now = time.time()
+        self._conn().execute(
+            f'INSERT OR REPLACE INTO "{self.name}" (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), now, now),
+        )
+        self._writes += 1
+        if self.max_entries and self._writes % _EVICT_EVERY == 0:
+            self.evict()
+
+    def delete(self, key):
+        self._conn().execute(f'DELETE FROM "{self.name}" WHERE key = ?', (key,))
+
+    def evict(self):
+        """Drop rows past TTL + stale window, then least recently used rows beyond max_entries. Returns rows removed."""
+        conn = self._conn()
+        removed = 0
+        if self.ttl_seconds is not None and self.max_stale_seconds is not None:
+            removed += conn.execute(
+                f'DELETE FROM "{self.name}" WHERE stored_at < ?',
+                (time.time() - self.ttl_seconds - self.max_stale_seconds,)
+            ).rowcount
+        if self.max_entries:
+            removed += conn.execute(
+                f'DELETE FROM "{self.name}" WHERE key IN ('
+                f' SELECT key FROM "{self.name}" ORDER BY accessed_at DESC LIMIT -1 OFFSET ?'
+                ")",
+                (self.max_entries,),
+            ).rowcount
+        return removed
+
+    def __len__(self):
+        return self._conn().execute(f'SELECT COUNT(*) FROM "{self.name}"').fetchone()[0]
+
+    def clear(self):
+        self._conn().execute(f'DELETE FROM "{self.name}"')
@@ -16,6 +16,10 @@ import firebase_admin
 from firebase_admin import credentials, firestore, auth
 from utils.tags_extractor import extract_tags
 from utils.moderation import is_description_safe 
+from utils.model_registry import model_registry
+from utils.city_index import city_index
+from utils.gem_cache import gem_cache
+from utils.gem_queries import normalize_tags
 import logging 
 
 
@@ -101,6 +105,10 @@ app.register_blueprint(progress_bp)
 community_post_bp = create_community_post_bp(db)
 app.register_blueprint(community_post_bp)
 
+# ML models load lazily on first use; MODEL_PRELOAD / MODEL_WARMUP load them at boot instead
+model_registry.start_from_env()
+gem_cache.start_listener_from_env(db)
+
 
 
 """def allowed_file(filename):
@@ -117,6 +125,12 @@ def reverse_geocode(lat, lon):
 def home():
     return 'Server is working!'
 
+@app.route('/admin/models', methods=['GET'])
+@login_required_user
+def model_status():
+    """Load state, load time and RSS growth per registered model, plus this worker's RSS."""
+    return jsonify(model_registry.stats()), 200
+
 @app.route('/manual-location', methods=['POST'])
 def save_manual_location():
     data = request.get_json()
@@ -379,6 +393,7 @@ def upload_to_firebase(session_id):
     final_data = {
         "description": description,
         "tags": tags,
+        "tags_normalized": normalize_tags(tags),  # for server-side tag filters (utils.gem_queries)
         "budget_category": budget,
         "context": context,
         "coordinates": {},
@@ -466,6 +481,13 @@ def push_to_firestore(state_name, city_name, session_id, data):
     gem_submission_doc_ref.set(data)
     current_app.logger.info(f"Hidden gem {session_id} added to Firestore under State: {state_name}, City: {city_name}.")
 
+    # Keep the city index used by the itinerary hidden-gem lookup in sync
+    try:
+        city_index.add(db, state_name, city_name)
+    except Exception as e:
+        current_app.logger.warning(f"Could not update hidden gem city index for {state_name}/{city_name}: {e}")
+    gem_cache.invalidate(city_name)
+
 
 if __name__ == '__main__':
     app.run(debug=True)
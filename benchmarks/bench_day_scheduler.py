@@ -0,0 +1,88 @@
+"""
+Benchmark: itinerary day scheduling, clustered vs sequential (the old greedy fill).
+
+For synthetic 1-30 day trips (POIs from a few city clusters plus day-trip
+outliers, ranked randomly, 2 POIs/day + 1 gem slot):
+  - mean day radius: avg km from each stop to its day's centroid
+  - worst day km:    nearest-neighbour walk through the day's stops
+  - total day km:    sum of those walks (what the proximity optimizer starts from)
+  - ms per schedule, and a determinism check (same input -> same days)
+
+Run from the repo root:
+    python benchmarks/bench_day_scheduler.py
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from diary.services.distance_matrix import haversine_km
+from Itinerarybuilder.utils.day_scheduler import coords_of, schedule_days
+
+DAYS = [1, 2, 3, 5, 7, 10, 14, 21, 30]
+MAX_PER_DAY = 2
+REPEATS = 5
+
+
+def _synthetic_trip(num_days, seed=11):
+    """1.5x the regular slots as ranked POIs, plus one gem per two days; ~5% far outliers."""
+    rng = random.Random(seed + num_days)
+    centers = [(rng.uniform(11, 16), rng.uniform(74, 79)) for _ in range(max(1, num_days // 4))]
+
+    def point():
+        lat, lng = rng.choice(centers)
+        spread = 0.6 if rng.random() < 0.05 else 0.05
+        return {"coordinates": {"lat": lat + rng.gauss(0, spread), "lng": lng + rng.gauss(0, spread)}}
+
+    pois = [point() for _ in range(int(num_days * MAX_PER_DAY * 1.5))]
+    gems = [point() for _ in range(max(1, num_days // 2))]
+    return pois, gems
+
+
+def _day_metrics(schedule, pois, gems):
+    radii, walks = [], []
+    for day in schedule:
+        pts = [coords_of(pois[i] if kind == "poi" else gems[i]) for kind, i in day]
+        if not pts:
+            walks.append(0.0)
+            continue
+        centroid = tuple(np.mean(pts, axis=0))
+        radii += [haversine_km(p, centroid) for p in pts]
+        # nearest-neighbour walk from the first stop
+        left, cur, km = pts[1:], pts[0], 0.0
+        while left:
+            nxt = min(left, key=lambda p: haversine_km(cur, p))
+            km += haversine_km(cur, nxt)
+            left.remove(nxt)
+            cur = nxt
+        walks.append(km)
+    return float(np.mean(radii)) if radii else 0.0, max(walks), sum(walks)
+
+
+def main():
+    print(f"{'days':>4} | {'mode':>10} | {'items':>5} | {'mean radius km':>14} | {'worst day km':>12} | "
+          f"{'total km':>9} | {'ms':>6}")
+    print("-" * 80)
+    for num_days in DAYS:
+        pois, gems = _synthetic_trip(num_days)
+        for mode in ("sequential", "clustered"):
+            t0 = time.perf_counter()
+            for _ in range(REPEATS):
+                schedule = schedule_days(pois, gems, num_days, MAX_PER_DAY, MAX_PER_DAY + 1, mode=mode)
+            elapsed = (time.perf_counter() - t0) * 1000 / REPEATS
+
+            assert schedule == schedule_days(pois, gems, num_days, MAX_PER_DAY, MAX_PER_DAY + 1, mode=mode)
+            assert all(len(day) <= MAX_PER_DAY + 1 for day in schedule)
+            radius, worst, total = _day_metrics(schedule, pois, gems)
+            items = sum(len(day) for day in schedule)
+            print(f"{num_days:>4} | {mode:>10} | {items:>5} | {radius:>14.1f} | {worst:>12.1f} | "
+                  f"{total:>9.1f} | {elapsed:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
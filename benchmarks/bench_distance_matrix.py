@@ -0,0 +1,76 @@
+"""
+Benchmark: pure-Python vs vectorized haversine matrix for the proximity optimizer.
+
+Old path = build_distance_matrix + a second all-pairs haversine sweep for the start index.
+New path = build_distance_matrix_np + row means read from the same matrix.
+
+Run from the repo root:
+    python benchmarks/bench_distance_matrix.py
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from diary.services.distance_matrix import (
+    haversine_km,
+    build_distance_matrix,
+    build_distance_matrix_np,
+    row_mean_distances,
+)
+
+SIZES = [50, 200, 1000]
+
+
+def _random_coords(n, seed=7):
+    # Spread across peninsular India so multi-city trips are represented
+    rng = random.Random(seed)
+    return [(rng.uniform(8.0, 28.0), rng.uniform(70.0, 88.0)) for _ in range(n)]
+
+
+def _old_path(coords):
+    dist = build_distance_matrix(coords)
+    n = len(coords)
+    best_idx, best_avg = 0, float("inf")
+    for i in range(n):
+        avg = sum(haversine_km(coords[i], coords[j]) for j in range(n) if j != i) / (n - 1 if n > 1 else 1)
+        if avg < best_avg:
+            best_idx, best_avg = i, avg
+    return dist, best_idx
+
+
+def _new_path(coords):
+    dist = build_distance_matrix_np(coords)
+    return dist, int(np.argmin(row_mean_distances(dist)))
+
+
+def _time(fn, *args, repeat=3):
+    best = float("inf")
+    out = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    print(f"{'points':>7} | {'old (ms)':>10} | {'new (ms)':>10} | {'speedup':>8} | {'max |diff| km':>13} | start")
+    print("-" * 72)
+    for n in SIZES:
+        coords = _random_coords(n)
+        # the pure-Python path is slow at 1000 points; one run is enough there
+        t_old, (d_old, s_old) = _time(_old_path, coords, repeat=1 if n >= 1000 else 3)
+        t_new, (d_new, s_new) = _time(_new_path, coords)
+        max_diff = float(np.max(np.abs(np.asarray(d_old) - d_new)))
+        print(f"{n:>7} | {t_old * 1000:>10.1f} | {t_new * 1000:>10.1f} | {t_old / t_new:>7.1f}x | "
+              f"{max_diff:>13.2e} | {'same' if s_old == s_new else f'{s_old} vs {s_new}'}")
+
+
+if __name__ == "__main__":
+    main()
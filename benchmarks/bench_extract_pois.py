@@ -0,0 +1,97 @@
+"""
+Benchmark: per-POI deepcopy vs compact refs in the proximity optimizer.
+
+Measures the flatten + output-assembly stages (the part that changed) on a
+1k-POI itinerary whose activities carry photos, reviews and nested tags,
+reporting wall time and peak traced memory.
+
+Runs offline (the optimizer only touches Firestore inside
+optimize_itinerary_by_proximity). Run from the repo root:
+    python benchmarks/bench_extract_pois.py
+"""
+import os
+import random
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from diary.services.proximity_optimizer import _extract_all_pois, optimize_itinerary_data
+
+NUM_POIS = 1000
+NUM_DAYS = 25
+
+
+def _heavy_itinerary(seed=5):
+    rng = random.Random(seed)
+    review = "Lovely spot, went there at sunset with family and the view was worth the climb. " * 4
+    itinerary = {f"Day {d + 1}": [] for d in range(NUM_DAYS)}
+    for i in range(NUM_POIS):
+        itinerary[f"Day {i % NUM_DAYS + 1}"].append({
+            "name": f"POI {i}",
+            "coordinates": {"lat": 12.9 + rng.uniform(-0.3, 0.3), "lng": 77.6 + rng.uniform(-0.3, 0.3)},
+            "tags": ["sunset", "nature", {"source": "bart", "scores": [rng.random() for _ in range(15)]}],
+            "photos": [{"url": f"/uploads/diary_photos/u/t/{i}_{k}.jpg",
+                        "exif": {"make": "Apple", "model": "iPhone", "gps": [12.9, 77.6]}} for k in range(5)],
+            "reviews": [review for _ in range(10)],
+            "best_time": "Evening",
+            "budget_category": "low",
+        })
+    return itinerary
+
+
+def _legacy_extract(itinerary_data):
+    all_pois = []
+    for _, activities in itinerary_data.items():
+        if isinstance(activities, list):
+            for poi in activities:
+                loc = poi.get("coordinates") or poi.get("location")
+                if loc and "lat" in loc and "lng" in loc:
+                    poi = deepcopy(poi)
+                    poi["location"] = {"lat": float(loc["lat"]), "lng": float(loc["lng"])}
+                    all_pois.append(poi)
+    return all_pois
+
+
+def _legacy_stage(itinerary):
+    pois = _legacy_extract(itinerary)
+    coords = [(p["location"]["lat"], p["location"]["lng"]) for p in pois]
+    return coords, [pois[j] for j in range(len(pois))]
+
+
+def _new_stage(itinerary):
+    pois = _extract_all_pois(itinerary)
+    coords = [(p.lat, p.lng) for p in pois]
+    return coords, [pois[j].to_output() for j in range(len(pois))]
+
+
+def _measure(fn, itinerary):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn(itinerary)
+    elapsed = (time.perf_counter() - t0) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    itinerary = _heavy_itinerary()
+    print(f"{NUM_POIS} POIs over {NUM_DAYS} days")
+    print(f"{'path':>8} | {'ms':>8} | {'peak MiB':>9}")
+    print("-" * 32)
+    for label, fn in (("deepcopy", _legacy_stage), ("refs", _new_stage)):
+        ms, mib = _measure(fn, itinerary)
+        print(f"{label:>8} | {ms:>8.1f} | {mib:>9.2f}")
+
+    t0 = time.perf_counter()
+    _, meta = optimize_itinerary_data(itinerary, use_cache=False)
+    print(f"\nfull optimize_itinerary_data: {(time.perf_counter() - t0) * 1000:.1f} ms "
+          f"(route {meta['route_km']} km)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: serial bare requests.get vs concurrent pooled review fetching.
+
+Starts a local stub of the Place Details endpoint (simulated latency, a share
+of 429 responses with Retry-After) and points the fetcher at it through
+GOOGLE_API_BASE_URL. Reports wall time, requests served, peak concurrency seen
+by the stub, and checks both paths return the same reviews.
+
+The stub is plain HTTP, so the saved TLS handshakes are not part of the numbers.
+Run from the repo root:
+    python benchmarks/bench_review_fetch.py [--places 60] [--latency-ms 80] [--rate-limited 0.05]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+class StubState:
+    def __init__(self, latency_s, rate_limited):
+        self.latency_s = latency_s
+        self.rate_limited = rate_limited
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.peak = 0
+        self.requests = 0
+        self.throttled = 0
+        self.rng = random.Random(7)
+
+
+def _make_handler(state):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            with state.lock:
+                state.in_flight += 1
+                state.peak = max(state.peak, state.in_flight)
+                state.requests += 1
+                throttle = state.rng.random() < state.rate_limited
+            try:
+                time.sleep(state.latency_s)
+                if throttle:
+                    with state.lock:
+                        state.throttled += 1
+                    self._send(429, {"error_message": "rate limited"}, {"Retry-After": "0.1"})
+                    return
+                place_id = parse_qs(urlsplit(self.path).query)["place_id"][0]
+                reviews = [{"text": f"Review {k} of {place_id}: lovely views and good local food."}
+                           for k in range(5)]
+                self._send(200, {"status": "OK", "result": {"reviews": reviews}})
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def _send(self, code, body, headers=None):
+            payload = json.dumps(body).encode()
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def _serial_bare(url, place_ids):
+    """The previous path: one requests.get (new connection) per place, one at a time, no retry."""
+    out = []
+    for place_id in place_ids:
+        data = requests.get(url, params={"place_id": place_id, "fields": "review", "key": "test"}).json()
+        out.append([r["text"] for r in data.get("result", {}).get("reviews", [])])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--places", type=int, default=60)
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--rate-limited", type=float, default=0.05, help="share of requests answered with 429")
+    args = parser.parse_args()
+
+    state = StubState(args.latency_ms / 1000, args.rate_limited)
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["GOOGLE_API_BASE_URL"] = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # Imported after the base URL is set
+    from Itinerarybuilder.get_reviews import GOOGLE_PLACE_DETAILS_URL, get_reviews_for_places
+    from Itinerarybuilder.utils.http_client import MAX_PER_HOST
+
+    place_ids = [f"place_{i}" for i in range(args.places)]
+    print(f"{args.places} places, {args.latency_ms:.0f} ms stub latency, "
+          f"{args.rate_limited:.0%} 429s, per-host limit {MAX_PER_HOST}")
+    print(f"{'path':>19} | {'s':>6} | {'requests':>8} | {'429s':>4} | {'peak conc':>9} | {'complete':>8}")
+    print("-" * 71)
+
+    state.rate_limited, saved = 0.0, state.rate_limited  # the bare path has no retry
+    t0 = time.perf_counter()
+    serial = _serial_bare(GOOGLE_PLACE_DETAILS_URL, place_ids)
+    elapsed = time.perf_counter() - t0
+    print(f"{'serial requests.get':>19} | {elapsed:>6.2f} | {state.requests:>8} | {state.throttled:>4} | "
+          f"{state.peak:>9} | {sum(bool(r) for r in serial):>8}")
+
+    state.rate_limited = saved
+    state.requests = state.throttled = state.peak = 0
+    t0 = time.perf_counter()
+    pooled = get_reviews_for_places(place_ids, use_cache=False, api_key="test")
+    elapsed = time.perf_counter() - t0
+    print(f"{'concurrent pooled':>19} | {elapsed:>6.2f} | {state.requests:>8} | {state.throttled:>4} | "
+          f"{state.peak:>9} | {sum(bool(r) for r in pooled):>8}")
+
+    assert pooled == serial, "concurrent fetch returned different reviews"
+    assert state.peak <= MAX_PER_HOST, "per-host concurrency limit exceeded"
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
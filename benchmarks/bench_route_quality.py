@@ -0,0 +1,100 @@
+"""
+Benchmark: route quality and runtime of the proximity optimizer stages.
+
+For synthetic 20-500 POI itineraries (clustered, with a few outliers):
+  - improve: 2-Opt alone vs 2-Opt + Or-opt (route km, ms)
+  - split:   count vs distance vs time (worst / best day km, worst day minutes, ms)
+
+Run from the repo root:
+    python benchmarks/bench_route_quality.py
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from diary.services.distance_matrix import build_distance_matrix_np, row_mean_distances
+from diary.services.route_search import nearest_neighbor_order, route_cost, two_opt, or_opt
+from diary.services.day_split import (
+    split_by_count,
+    split_by_travel,
+    DEFAULT_SPEED_KMH,
+    DEFAULT_VISIT_MINUTES,
+)
+
+SIZES = [20, 50, 100, 200, 500]
+POIS_PER_DAY = 4
+BUDGET_MS = 200.0
+
+
+def _synthetic_itinerary(n, seed=3):
+    """A few city clusters plus ~5% far-away day-trip POIs."""
+    rng = random.Random(seed + n)
+    centers = [(rng.uniform(11, 16), rng.uniform(74, 79)) for _ in range(max(1, n // 60))]
+    pts = []
+    for i in range(n):
+        lat, lng = centers[i % len(centers)]
+        spread = 0.6 if rng.random() < 0.05 else 0.05
+        pts.append((lat + rng.gauss(0, spread), lng + rng.gauss(0, spread)))
+    return pts
+
+
+def _day_stats(days, rows):
+    kms = [route_cost(d, rows) if len(d) > 1 else 0.0 for d in days]
+    mins = [km / DEFAULT_SPEED_KMH * 60 + DEFAULT_VISIT_MINUTES * len(d) for km, d in zip(kms, days)]
+    return max(kms), min(kms), max(mins)
+
+
+def main():
+    print("Route improvement")
+    print(f"{'POIs':>5} | {'NN km':>8} | {'2opt km':>8} | {'2opt ms':>8} | {'+oropt km':>9} | {'+oropt ms':>9}")
+    print("-" * 62)
+    routes = {}
+    for n in SIZES:
+        coords = _synthetic_itinerary(n)
+        dist = build_distance_matrix_np(coords)
+        rows = dist.tolist()
+        nn = nearest_neighbor_order(dist, int(np.argmin(row_mean_distances(dist))))
+
+        t0 = time.perf_counter()
+        r2 = two_opt(nn, dist, time_budget_ms=BUDGET_MS)
+        t_2 = (time.perf_counter() - t0) * 1000
+
+        t0 = time.perf_counter()
+        r3 = two_opt(nn, dist, time_budget_ms=BUDGET_MS / 2)
+        r3 = or_opt(r3, dist, time_budget_ms=BUDGET_MS / 3)
+        r3 = two_opt(r3, dist, time_budget_ms=BUDGET_MS / 6)
+        t_3 = (time.perf_counter() - t0) * 1000
+
+        routes[n] = (r3, dist, rows)
+        print(f"{n:>5} | {route_cost(nn, rows):>8.1f} | {route_cost(r2, rows):>8.1f} | {t_2:>8.1f} | "
+              f"{route_cost(r3, rows):>9.1f} | {t_3:>9.1f}")
+
+    print()
+    print("Day split (on the 2-Opt + Or-opt route)")
+    print(f"{'POIs':>5} | {'days':>4} | {'mode':>8} | {'max day km':>10} | {'min day km':>10} | "
+          f"{'max day min':>11} | {'ms':>6}")
+    print("-" * 72)
+    for n in SIZES:
+        route, dist, rows = routes[n]
+        num_days = max(1, n // POIS_PER_DAY)
+        for mode in ("count", "distance", "time"):
+            t0 = time.perf_counter()
+            if mode == "count":
+                days = split_by_count(route, num_days)
+            else:
+                days = split_by_travel(route, dist, num_days, mode=mode)
+            elapsed = (time.perf_counter() - t0) * 1000
+            assert sum(days, []) == route
+            worst, best, worst_min = _day_stats(days, rows)
+            print(f"{n:>5} | {num_days:>4} | {mode:>8} | {worst:>10.1f} | {best:>10.1f} | "
+                  f"{worst_min:>11.0f} | {elapsed:>6.1f}")
+
+
+if __name__ == "__main__":
+    main()
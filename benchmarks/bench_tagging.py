@@ -0,0 +1,74 @@
+"""
+Benchmark: per-review vs batched zero-shot tagging throughput.
+
+Legacy path = one classifier call per review (plus the old 50 ms sleep, reported
+separately). Batched path = tag_places_with_reviews over all places at once,
+review-tag cache off; it classifies each distinct review once, so its rate is
+reviews actually sent to the model per second. Also checks the batched tags
+equal the per-review aggregation.
+
+Loads facebook/bart-large-mnli on CPU. Run from the repo root:
+    python benchmarks/bench_tagging.py [--repeat 4]
+"""
+import argparse
+import os
+import sys
+import time
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import Itinerarybuilder.tag_reviews as tag_reviews
+from Itinerarybuilder.tag_reviews import LABELS, _aggregate_tags, classifier, tag_places_with_reviews
+from benchmarks.review_corpus import PLACES
+
+BATCH_SIZES = [1, 4, 8, 16]
+LEGACY_SLEEP_S = 0.05
+
+
+def _legacy(places):
+    out = []
+    for _, reviews in places:
+        results = [classifier(r.strip(), LABELS, multi_label=True) for r in reviews if r.strip()]
+        out.append(_aggregate_tags(results, 0.6, 2))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=4, help="replicate the corpus N times")
+    args = parser.parse_args()
+
+    places = PLACES * args.repeat
+    n_reviews = sum(len(r) for _, r in places)
+    print(f"{len(places)} places, {n_reviews} reviews")
+
+    classifier("warm up", LABELS, multi_label=True)
+
+    t0 = time.perf_counter()
+    legacy_tags = _legacy(places)
+    t_legacy = time.perf_counter() - t0
+    print(f"{'per-review':>12} | {n_reviews / t_legacy:>8.2f} reviews/s | {t_legacy:>7.1f} s "
+          f"(+{n_reviews * LEGACY_SLEEP_S:.1f} s of sleeps in the old loop)")
+
+    # Count the reviews the batched path actually sends to the model
+    classified = [0]
+
+    def counting_classifier(texts, labels, *a, **kw):
+        classified[0] += 1 if isinstance(texts, str) else len(texts)
+        return classifier(texts, labels, *a, **kw)
+
+    tag_reviews.classifier = counting_classifier
+
+    for bs in BATCH_SIZES:
+        classified[0] = 0
+        t0 = time.perf_counter()
+        batched_tags = tag_places_with_reviews(places, batch_size=bs, use_cache=False, mode="nli")
+        elapsed = time.perf_counter() - t0
+        same = "same tags" if batched_tags == legacy_tags else "TAGS DIFFER"
+        print(f"{'batch=' + str(bs):>12} | {classified[0] / elapsed:>8.2f} reviews/s | {elapsed:>7.1f} s | "
+              f"{classified[0]} classified | {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: accuracy vs latency of the tagger inference backends (fp32 / int8 / onnx).
+
+On the fixed review corpus (benchmarks/review_corpus.py), for each backend:
+  - reviews:      BART-large-MNLI zero-shot, aggregated per place like tag_places_with_reviews
+  - descriptions: MiniLM label-embedding tags (each review treated as a description)
+reports load time, throughput, and agreement with fp32 (mean per-place tag Jaccard,
+mean |score delta|, exact top-3 matches for descriptions).
+
+Backends whose dependencies are missing (onnx needs optimum[onnxruntime]) are skipped.
+Run from the repo root:
+    python benchmarks/bench_tagging_backends.py [--batch-size 8]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from utils.inference_backend import BACKENDS, load_sentence_encoder, load_zero_shot_pipeline
+from utils.label_embeddings import normalize_rows
+from Itinerarybuilder.tag_reviews import LABELS, MODEL_NAME as NLI_MODEL, _aggregate_tags
+from utils.tags_extractor import MODEL_NAME as EMBED_MODEL, _select_tags
+from benchmarks.review_corpus import PLACES, all_reviews
+
+
+def _jaccard(a, b):
+    a, b = set(a), set(b)
+    return 1.0 if not a and not b else len(a & b) / len(a | b)
+
+
+def _run_nli(classifier, reviews, batch_size):
+    results = []
+    for start in range(0, len(reviews), batch_size):
+        out = classifier(reviews[start:start + batch_size], LABELS, multi_label=True,
+                         batch_size=batch_size * len(LABELS))
+        results.extend([out] if isinstance(out, dict) else out)
+    # label -> score, independent of each result's sort order
+    return [dict(zip(r["labels"], r["scores"])) for r in results]
+
+
+def _place_tags(score_maps):
+    tags, i = [], 0
+    for _, reviews in PLACES:
+        chunk = score_maps[i:i + len(reviews)]
+        i += len(reviews)
+        tags.append(_aggregate_tags(
+            [{"labels": list(m), "scores": list(m.values())} for m in chunk], 0.6, 2
+        ))
+    return tags
+
+
+def bench_reviews(batch_size):
+    reviews = all_reviews()
+    print(f"\nReview tagging ({NLI_MODEL}, {len(reviews)} reviews, batch={batch_size})")
+    print(f"{'backend':>8} | {'load s':>7} | {'reviews/s':>9} | {'tag jaccard':>11} | {'|Δscore|':>8}")
+    print("-" * 56)
+    reference = None
+    for backend in BACKENDS:
+        try:
+            t0 = time.perf_counter()
+            classifier = load_zero_shot_pipeline(NLI_MODEL, backend)
+            load_s = time.perf_counter() - t0
+        except ImportError as e:
+            print(f"{backend:>8} | skipped: {e}")
+            continue
+        _run_nli(classifier, reviews[:2], batch_size)  # warm up
+        t0 = time.perf_counter()
+        scores = _run_nli(classifier, reviews, batch_size)
+        elapsed = time.perf_counter() - t0
+        tags = _place_tags(scores)
+        if reference is None:
+            reference = (scores, tags)
+        ref_scores, ref_tags = reference
+        jac = np.mean([_jaccard(a, b) for a, b in zip(tags, ref_tags)])
+        delta = np.mean([abs(m[l] - r[l]) for m, r in zip(scores, ref_scores) for l in LABELS])
+        print(f"{backend:>8} | {load_s:>7.1f} | {len(reviews) / elapsed:>9.2f} | {jac:>11.3f} | {delta:>8.4f}")
+
+
+def bench_descriptions():
+    texts = all_reviews()
+    print(f"\nDescription tagging ({EMBED_MODEL}, {len(texts)} descriptions)")
+    print(f"{'backend':>8} | {'load s':>7} | {'desc/s':>9} | {'top3 same':>9} | {'|Δsim|':>8}")
+    print("-" * 54)
+    reference = None
+    for backend in BACKENDS:
+        try:
+            t0 = time.perf_counter()
+            model = load_sentence_encoder(EMBED_MODEL, backend)
+            load_s = time.perf_counter() - t0
+        except ImportError as e:
+            print(f"{backend:>8} | skipped: {e}")
+            continue
+        label_emb = normalize_rows(model.encode(LABELS))
+        model.encode(texts[:2])  # warm up
+        t0 = time.perf_counter()
+        sims = normalize_rows(model.encode(texts)) @ label_emb.T
+        elapsed = time.perf_counter() - t0
+        tags = [_select_tags(row.tolist(), 0.4, 3) for row in sims]
+        if reference is None:
+            reference = (sims, tags)
+        ref_sims, ref_tags = reference
+        same = np.mean([a[:3] == b[:3] for a, b in zip(tags, ref_tags)])
+        delta = float(np.abs(sims - ref_sims).mean())
+        print(f"{backend:>8} | {load_s:>7.1f} | {len(texts) / elapsed:>9.1f} | {same:>9.2%} | {delta:>8.4f}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch-size", type=int, default=8)
+    args = parser.parse_args()
+    bench_reviews(args.batch_size)
+    bench_descriptions()
+
+
+if __name__ == "__main__":
+    main()
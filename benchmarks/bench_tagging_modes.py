@@ -0,0 +1,76 @@
+"""
+Benchmark: NLI vs embedding POI tagging (with and without NLI re-ranking).
+
+Tags every place of the fixed review corpus with:
+  - nli              BART zero-shot on every review (reference; review-tag cache off)
+  - embedding        MiniLM review/label similarity only
+  - embedding+rerank MiniLM, NLI only for borderline labels
+and reports wall time, speedup over nli, NLI hypotheses evaluated, and tag
+agreement with nli (mean Jaccard, exact-match share of places).
+
+Run from the repo root:
+    python benchmarks/bench_tagging_modes.py [--repeat 2]
+"""
+import argparse
+import os
+import sys
+import time
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+import Itinerarybuilder.tag_reviews as tag_reviews
+from benchmarks.review_corpus import PLACES
+
+MODES = [
+    ("nli", dict(mode="nli")),
+    ("embedding", dict(mode="embedding", rerank=False)),
+    ("embedding+rerank", dict(mode="embedding", rerank=True)),
+]
+
+
+def _jaccard(a, b):
+    a, b = set(a), set(b)
+    return 1.0 if not a and not b else len(a & b) / len(a | b)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=2, help="replicate the corpus N times")
+    args = parser.parse_args()
+    places = PLACES * args.repeat
+
+    # Count (review, label) hypotheses sent to the NLI model
+    hypotheses = [0]
+    nli = tag_reviews.classifier
+
+    def counting_classifier(texts, labels, *a, **kw):
+        hypotheses[0] += (1 if isinstance(texts, str) else len(texts)) * len(labels)
+        return nli(texts, labels, *a, **kw)
+
+    tag_reviews.classifier = counting_classifier
+
+    # Load both models up front so load time is not billed to a mode
+    tag_reviews.tag_places_with_reviews(PLACES[:1], mode="nli", use_cache=False)
+    tag_reviews.tag_places_with_reviews(PLACES[:1], mode="embedding", rerank=False)
+
+    reference = None
+    print(f"{len(places)} places, {sum(len(r) for _, r in places)} reviews")
+    print(f"{'mode':>17} | {'s':>7} | {'speedup':>7} | {'NLI hyps':>8} | {'jaccard':>7} | {'exact':>6}")
+    print("-" * 68)
+    for label, kwargs in MODES:
+        hypotheses[0] = 0
+        t0 = time.perf_counter()
+        tags = tag_reviews.tag_places_with_reviews(places, use_cache=False, **kwargs)
+        elapsed = time.perf_counter() - t0
+        if reference is None:
+            reference = (tags, elapsed)
+        ref_tags, ref_s = reference
+        jac = sum(_jaccard(a, b) for a, b in zip(tags, ref_tags)) / len(tags)
+        exact = sum(set(a) == set(b) for a, b in zip(tags, ref_tags)) / len(tags)
+        print(f"{label:>17} | {elapsed:>7.2f} | {ref_s / elapsed:>6.1f}x | {hypotheses[0]:>8} | "
+              f"{jac:>7.3f} | {exact:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Benchmark: legacy full-recompute 2-opt vs neighbour-list delta 2-opt.
+
+Both start from the same nearest-neighbour path over the same matrix.
+
+Run from the repo root:
+    python benchmarks/bench_two_opt.py
+"""
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+# ✅ Fix Python import path to support running as script
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from diary.services.distance_matrix import build_distance_matrix_np, row_mean_distances
+from diary.services.route_search import nearest_neighbor_order, route_cost, two_opt
+
+SIZES = [30, 100, 300, 1000]
+# the legacy 2-opt is O(n^3) per pass; past this it takes minutes
+LEGACY_MAX_N = 300
+
+
+def _legacy_two_opt(order, dist, max_passes=12):
+    """The pre-neighbour-list implementation, kept here only for comparison."""
+    best = order[:]
+    best_cost = route_cost(best, dist)
+    n = len(order)
+    improved = True
+    passes = 0
+    while improved and passes < max_passes:
+        improved = False
+        passes += 1
+        for i in range(0, n - 3):
+            for k in range(i + 2, n - 1):
+                new_order = best[:i + 1] + best[i + 1:k + 1][::-1] + best[k + 1:]
+                new_cost = route_cost(new_order, dist)
+                if new_cost + 1e-9 < best_cost:
+                    best = new_order
+                    best_cost = new_cost
+                    improved = True
+    return best
+
+
+def _clustered_coords(n, seed=11):
+    # A handful of city clusters, like a multi-city trip
+    rng = random.Random(seed)
+    centers = [(rng.uniform(10, 26), rng.uniform(72, 86)) for _ in range(max(1, n // 40))]
+    pts = []
+    for i in range(n):
+        lat, lng = centers[i % len(centers)]
+        pts.append((lat + rng.gauss(0, 0.08), lng + rng.gauss(0, 0.08)))
+    return pts
+
+
+def main():
+    print(f"{'points':>7} | {'NN km':>9} | {'legacy km':>9} | {'legacy ms':>10} | {'delta km':>9} | {'delta ms':>9}")
+    print("-" * 68)
+    for n in SIZES:
+        coords = _clustered_coords(n)
+        dist = build_distance_matrix_np(coords)
+        rows = dist.tolist()
+        start = int(np.argmin(row_mean_distances(dist)))
+        nn = nearest_neighbor_order(dist, start)
+
+        if n <= LEGACY_MAX_N:
+            t0 = time.perf_counter()
+            legacy = _legacy_two_opt(nn, rows)
+            t_legacy = (time.perf_counter() - t0) * 1000
+            legacy_cost = f"{route_cost(legacy, rows):>9.1f}"
+            legacy_ms = f"{t_legacy:>10.1f}"
+        else:
+            legacy_cost, legacy_ms = f"{'-':>9}", f"{'skipped':>10}"
+
+        t0 = time.perf_counter()
+        fast = two_opt(nn, dist)
+        t_fast = (time.perf_counter() - t0) * 1000
+
+        assert sorted(fast) == list(range(n)) and fast[0] == nn[0]
+        print(f"{n:>7} | {route_cost(nn, rows):>9.1f} | {legacy_cost} | {legacy_ms} | "
+              f"{route_cost(fast, rows):>9.1f} | {t_fast:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
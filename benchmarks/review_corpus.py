@@ -0,0 +1,62 @@
+"""
+Fixed review corpus shared by the tagging benchmarks.
+
+Hand-written in the style of Google Places reviews for Indian tourist spots,
+grouped per place so per-place aggregation (min_occurrences) is exercised.
+"""
+
+PLACES = [
+    ("Nandi Hills", [
+        "Reached before dawn and the sunrise over the clouds was unreal. Very crowded on weekends though.",
+        "Beautiful viewpoint, cool breeze and great for photos. The climb by bike is fun.",
+        "Went with my wife for the sunset, super romantic spot but parking is a mess.",
+        "Good short trek from the base village, carry water. Views are worth it.",
+        "Too many people on Sunday morning, but the fort ruins and the Nandi temple are nice.",
+    ]),
+    ("Lalbagh Botanical Garden", [
+        "Huge green space in the middle of the city, perfect for a peaceful morning walk.",
+        "Took the kids to the flower show, they loved the glass house. Very family friendly.",
+        "Old trees, the lake and lots of birds. Great place for nature lovers and photographers.",
+        "Quiet on weekdays, crowded during the Republic Day flower show.",
+        "Historical garden from Hyder Ali's time, the rock formation is billions of years old.",
+    ]),
+    ("ISKCON Temple Bangalore", [
+        "Very spiritual experience, the evening aarti is beautiful and well organised.",
+        "Huge temple complex, long queues on festivals. Prasadam at the end is tasty.",
+        "Peaceful atmosphere inside despite the crowd. Architecture is stunning at night.",
+        "Cultural shows and chanting make it a unique visit, shoes have to be deposited outside.",
+    ]),
+    ("VV Puram Food Street", [
+        "Best place for local food in Bangalore, try the holige and the gobi manchurian.",
+        "Very crowded in the evening but that's part of the fun. Cheap and tasty street food.",
+        "A must for foodies, dosa and masala puri were amazing. Go hungry!",
+        "Local food heaven, parking is difficult so take an auto.",
+    ]),
+    ("Bangalore Palace", [
+        "Tudor style palace with a lot of history, the audio guide is informative.",
+        "Photogenic interiors and old paintings, entry ticket is a bit expensive.",
+        "Good for a couple of hours, learnt a lot about the Wadiyar dynasty. Historical and cultural.",
+        "Nice grounds, hosts concerts sometimes. Not much shade for kids in the afternoon.",
+    ]),
+    ("Skandagiri", [
+        "Night trek to catch the sunrise above the clouds, adventurous and tiring.",
+        "Trek is moderate, guide is compulsory now. The view at the top is breathtaking.",
+        "Adventure lovers will enjoy it, not suitable for kids or elderly.",
+        "Went for the sunrise trek with friends, one of the best experiences near Bangalore.",
+    ]),
+    ("Cubbon Park", [
+        "Lush green lungs of the city, quiet mornings and lots of joggers.",
+        "Peaceful place to read a book under the trees, weekend mornings are car free.",
+        "Kids play area and the aquarium nearby make it good for families.",
+        "Great for photography, especially the red High Court building in the park.",
+    ]),
+    ("Ulsoor Lake", [
+        "Boating at sunset is lovely, a calm spot in the middle of the city.",
+        "Small lake with islands, nice for a short walk. Not very clean in parts.",
+        "Peaceful in the early morning, locals come for walks and bird watching.",
+    ]),
+]
+
+
+def all_reviews():
+    return [review for _, reviews in PLACES for review in reviews]
@@ -6,6 +6,7 @@ from diary.services.firestore_photo_storage import (
 )
 from diary.services.itinerary_pipeline import optimize_then_save_itinerary
 from diary.services.proximity_optimizer import optimize_itinerary_by_proximity
+from diary.services.optimizer_jobs import submit_optimization, OptimizerQueueFull
 from diary.utils.firestore_paths import itinerary_doc, photos_col
 from collections import defaultdict
 from datetime import datetime
@@ -19,7 +20,8 @@ def create_diary_bp(db):
     
     @diary_bp.route("/user-itinerary/<user_id>/<trip_id>", methods=["PUT"])
     def update_user_itinerary(user_id, trip_id):
-        """Save/update itinerary: ALWAYS optimize before finalizing."""
+        """Save/update itinerary: ALWAYS optimize before finalizing.
+        ?async=true queues the save and returns a job id (poll /proximity/jobs/<job_id>)."""
         try:
             payload = request.get_json()
             if not payload:
@@ -27,17 +29,32 @@ def create_diary_bp(db):
             if not isinstance(payload.get("itinerary"), dict) or not payload["itinerary"]:
                 return jsonify({"error": "Missing or invalid 'itinerary'"}), 400
 
+            if request.args.get("async", "false").lower() == "true":
+                try:
+                    # latest payload wins if a save for this trip is still waiting
+                    job_id = submit_optimization(user_id, trip_id, optimize_then_save_itinerary,
+                                                 user_id, trip_id, payload, replace_pending=True)
+                except OptimizerQueueFull as e:
+                    return jsonify({"error": str(e)}), 503
+                return jsonify({
+                    "message": "Itinerary save & optimize queued",
+                    "user_id": user_id,
+                    "trip_id": trip_id,
+                    "job_id": job_id,
+                    "status_url": f"/proximity/jobs/{job_id}"
+                }), 202
+
             # Run pipeline
             optimized = optimize_then_save_itinerary(user_id, trip_id, payload)
 
-            meta = itinerary_doc(user_id, trip_id).get().to_dict() or {}
+            # trip meta is exactly what we just wrote; no need to read it back
             return jsonify({
                 "message": "Itinerary saved & optimized",
                 "user_id": user_id,
                 "trip_id": trip_id,
-                "trip_name": meta.get("trip_name"),
-                "start_date": meta.get("start_date"),
-                "end_date": meta.get("end_date"),
+                "trip_name": payload.get("trip_name"),
+                "start_date": payload.get("start_date"),
+                "end_date": payload.get("end_date"),
                 "itinerary": optimized
             }), 200
         except Exception as e:
@@ -343,7 +360,6 @@ def create_diary_bp(db):
             optimized = optimize_itinerary_by_proximity(user_id, trip_id)
             if not optimized:
                 return jsonify({"error": "Nothing to optimize"}), 404
-            itinerary_doc(user_id, trip_id).update({"itinerary": optimized})
             return jsonify({
                 "message": "Itinerary re-optimized",
                 "user_id": user_id,
@@ -1,6 +1,7 @@
 from flask import Blueprint, request, jsonify
 from diary.services.proximity_optimizer import optimize_itinerary_by_proximity
 from diary.utils.firestore_paths import itineraries_col, itinerary_doc
+from diary.services.optimizer_jobs import submit_optimization, OptimizerQueueFull
 
 def create_progress_bp(db):
     """Create and return progress blueprint with database instance"""
@@ -22,6 +23,19 @@ def create_progress_bp(db):
                 snap = ref.get()
                 if not snap.exists:
                     return jsonify({"error": "Itinerary not found"}), 404
+
+                if data.get("async") or request.args.get("async", "false").lower() == "true":
+                    try:
+                        job_id = submit_optimization(user_id, trip_id, optimize_itinerary_by_proximity,
+                                                     user_id, trip_id)
+                    except OptimizerQueueFull as e:
+                        return jsonify({"error": str(e)}), 503
+                    return jsonify({
+                        "message": "Itinerary optimization queued",
+                        "trip_id": trip_id,
+                        "job_id": job_id,
+                        "status_url": f"/proximity/jobs/{job_id}"
+                    }), 202
                 
                 optimized = optimize_itinerary_by_proximity(user_id, trip_id)
                 return jsonify({
@@ -1,5 +1,8 @@
 from flask import Blueprint, request, jsonify
-from diary.services.proximity_optimizer import optimize_itinerary_by_proximity
+from diary.services.proximity_optimizer import optimize_itinerary_by_proximity, IMPROVE_MODES
+from diary.services.day_split import SPLIT_MODES
+from diary.services.optimizer_jobs import submit_optimization, get_job, OptimizerQueueFull
+from diary.services.optimizer_cache import result_cache
 
 def create_proximity_bp(db):
     """Create and return proximity blueprint with database instance"""
@@ -14,17 +17,39 @@ def create_proximity_bp(db):
           - user_id: ID of the user
           - trip_id: ID of the trip
           - commit (optional): if 'false', do not update Firestore, just return result
+          - improve (optional): 'two_opt' (default) or 'or_opt' (adds Or-opt segment moves)
+          - split (optional): 'count' (default), 'distance' or 'time' per-day balancing
+          - async (optional): if 'true', queue the run and return a job id (poll /proximity/jobs/<job_id>)
         """
 
         user_id = request.args.get("user_id")
         trip_id = request.args.get("trip_id")
         commit_flag = request.args.get("commit", "true").lower() != "false"  # Defaults to True
+        improve = request.args.get("improve", "two_opt").lower()
+        split = request.args.get("split", "count").lower()
+        async_flag = request.args.get("async", "false").lower() == "true"
 
         if not user_id or not trip_id:
             return jsonify({"error": "Missing user_id or trip_id"}), 400
+        if improve not in IMPROVE_MODES:
+            return jsonify({"error": f"Invalid improve mode. Use one of: {', '.join(IMPROVE_MODES)}"}), 400
+        if split not in SPLIT_MODES:
+            return jsonify({"error": f"Invalid split mode. Use one of: {', '.join(SPLIT_MODES)}"}), 400
+
+        if async_flag:
+            try:
+                job_id = submit_optimization(user_id, trip_id, optimize_itinerary_by_proximity,
+                                             user_id, trip_id, improve=improve, split=split)
+            except OptimizerQueueFull as e:
+                return jsonify({"error": str(e)}), 503
+            return jsonify({
+                "message": "Optimization queued",
+                "job_id": job_id,
+                "status_url": f"/proximity/jobs/{job_id}"
+            }), 202
 
         try:
-            result = optimize_itinerary_by_proximity(user_id, trip_id)
+            result = optimize_itinerary_by_proximity(user_id, trip_id, improve=improve, split=split)
 
             if not result:
                 return jsonify({"error": "Itinerary not found or no POIs to optimize."}), 404
@@ -42,5 +67,18 @@ def create_proximity_bp(db):
 
         except Exception as e:
             return jsonify({"error": str(e)}), 500
+
+    @proximity_bp.route("/jobs/<job_id>", methods=["GET"])
+    def optimization_job_status(job_id):
+        """Status/result of a queued optimization (from any ?async=true optimize/save route)."""
+        job = get_job(job_id)
+        if not job:
+            return jsonify({"error": "Job not found or expired"}), 404
+        return jsonify(job), 200
+
+    @proximity_bp.route("/cache-stats", methods=["GET"])
+    def optimization_cache_stats():
+        """Hit/miss counters of the coordinate-fingerprint result cache."""
+        return jsonify(result_cache.stats()), 200
     
     return proximity_bp
@@ -0,0 +1,77 @@
+from typing import List
+
+import numpy as np
+
+SPLIT_MODES = ("count", "distance", "time")
+
+# Defaults for "time" mode: straight-line km at an average city pace,
+# plus a fixed visit duration per stop.
+DEFAULT_SPEED_KMH = 25.0
+DEFAULT_VISIT_MINUTES = 90.0
+
+
+def split_by_count(order: List[int], num_days: int) -> List[List[int]]:
+    """Balanced split: sizes differ by at most 1."""
+    n = len(order)
+    base = n // num_days
+    remainder = n % num_days
+    sizes = [base + 1 if i < remainder else base for i in range(num_days)]
+    out, idx = [], 0
+    for s in sizes:
+        out.append(order[idx: idx + s])
+        idx += s
+    return out
+
+
+def split_by_travel(order: List[int], dist, num_days: int, mode: str = "distance",
+                    speed_kmh: float = DEFAULT_SPEED_KMH,
+                    visit_minutes: float = DEFAULT_VISIT_MINUTES) -> List[List[int]]:
+    """
+    Cut the optimized path into num_days contiguous, non-empty days so that
+    per-day load is as even as possible (minimizes the sum of squared day loads).
+
+      - "distance": load = km travelled inside the day
+      - "time":     load = travel minutes + visit_minutes per stop
+
+    Day loads come from prefix sums over the path's edge lengths; the cut
+    points are chosen by dynamic programming over all (start, end) pairs.
+    The overnight hop between two days is not charged to either day.
+    """
+    if mode not in ("distance", "time"):
+        raise ValueError(f"Unknown split mode '{mode}'")
+
+    n = len(order)
+    if num_days <= 1 or n <= num_days:
+        return split_by_count(order, num_days)
+
+    d = np.asarray(dist, dtype=np.float64)
+    idx = np.asarray(order)
+    edges = d[idx[:-1], idx[1:]]
+    prefix = np.concatenate(([0.0], np.cumsum(edges)))  # prefix[t] = km from order[0] to order[t]
+
+    # load[a, b] for the day holding path positions a..b-1
+    a = np.arange(n + 1)[:, None]
+    b = np.arange(n + 1)[None, :]
+    valid = a < b
+    travel = prefix[np.clip(b - 1, 0, n - 1)] - prefix[np.clip(a, 0, n - 1)]
+    if mode == "time":
+        load = travel / speed_kmh * 60.0 + visit_minutes * (b - a)
+    else:
+        load = travel
+    # tiny count term so ties (e.g. all stops at one spot) still balance by size
+    cost = np.where(valid, load ** 2 + 1e-9 * (b - a) ** 2, np.inf)
+
+    # dp[k][e] = best cost of covering positions 0..e-1 with k days
+    dp = np.full((num_days + 1, n + 1), np.inf)
+    dp[0, 0] = 0.0
+    choice = np.zeros((num_days + 1, n + 1), dtype=np.int64)
+    for k in range(1, num_days + 1):
+        total = dp[k - 1][:, None] + cost
+        choice[k] = np.argmin(total, axis=0)
+        dp[k] = total[choice[k], np.arange(n + 1)]
+
+    cuts = [n]
+    for k in range(num_days, 0, -1):
+        cuts.append(int(choice[k, cuts[-1]]))
+    cuts.reverse()
+    return [order[cuts[k]:cuts[k + 1]] for k in range(num_days)]
@@ -0,0 +1,64 @@
+import math
+from typing import List, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+
+# -----------------------------
+# Pure-Python path (reference)
+# -----------------------------
+def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    R = EARTH_RADIUS_KM
+    lat1, lon1 = a
+    lat2, lon2 = b
+    d_lat = math.radians(lat2 - lat1)
+    d_lon = math.radians(lon2 - lon1)
+    la1 = math.radians(lat1)
+    la2 = math.radians(lat2)
+
+    h = (math.sin(d_lat / 2) ** 2
+         + math.cos(la1) * math.cos(la2) * math.sin(d_lon / 2) ** 2)
+    return 2 * R * math.asin(math.sqrt(h))
+
+
+def build_distance_matrix(coords: List[Tuple[float, float]]) -> List[List[float]]:
+    n = len(coords)
+    dist = [[0.0] * n for _ in range(n)]
+    for i in range(n):
+        for j in range(i + 1, n):
+            d = haversine_km(coords[i], coords[j])
+            dist[i][j] = d
+            dist[j][i] = d
+    return dist
+
+
+# -----------------------------
+# Vectorized path (default)
+# -----------------------------
+def build_distance_matrix_np(coords: List[Tuple[float, float]]) -> np.ndarray:
+    """
+    Full haversine matrix in one broadcast:
+      - radians computed once per point
+      - (n, n) float64 result, symmetric, zero diagonal
+    """
+    pts = np.asarray(coords, dtype=np.float64).reshape(-1, 2)
+    lat = np.radians(pts[:, 0])
+    lng = np.radians(pts[:, 1])
+    cos_lat = np.cos(lat)
+
+    d_lat = lat[:, None] - lat[None, :]
+    d_lng = lng[:, None] - lng[None, :]
+    h = np.sin(d_lat / 2) ** 2 + cos_lat[:, None] * cos_lat[None, :] * np.sin(d_lng / 2) ** 2
+    # rounding can push h a hair above 1.0 for antipodal points
+    np.clip(h, 0.0, 1.0, out=h)
+    dist = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(h))
+    np.fill_diagonal(dist, 0.0)
+    return dist
+
+
+def row_mean_distances(dist: np.ndarray) -> np.ndarray:
+    """Average distance from each point to every other point (diagonal excluded)."""
+    n = dist.shape[0]
+    return dist.sum(axis=1) / (n - 1 if n > 1 else 1)
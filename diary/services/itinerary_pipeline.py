@@ -1,30 +1,32 @@
 from typing import Dict, Any
 
 from diary.utils.firestore_paths import itinerary_doc
-from diary.services.proximity_optimizer import optimize_itinerary_by_proximity
+from diary.services.proximity_optimizer import optimize_itinerary_data
 
 
-def optimize_then_save_itinerary(user_id: str, trip_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+def optimize_then_save_itinerary(user_id: str, trip_id: str, payload: Dict[str, Any],
+                                 use_cache: bool = True) -> Dict[str, Any]:
     """
     Pipeline to persist itinerary data ensuring proximity optimization:
-      1) Write incoming payload (trip meta + itinerary).
-      2) Run optimizer (reads from the just-written doc).
-      3) Persist ONLY the optimized itinerary as authoritative.
-      4) Return optimized itinerary for response.
+      1) Optimize the incoming itinerary in memory (no Firestore read);
+         re-saves of an unchanged coordinate set reuse the cached day split.
+      2) Write payload + optimized itinerary + original backup in ONE set().
+      3) Return optimized itinerary for response.
     """
     if not isinstance(payload, dict):
         raise ValueError("payload must be a dict with at least an 'itinerary' key")
 
-    # 1) Save incoming payload (includes itinerary, trip_name, dates, etc.)
-    itinerary_doc(user_id, trip_id).set(payload, merge=False)
+    original = payload.get("itinerary", {})
 
-    # 2) Optimize (reads from the just-written doc)
-    optimized = optimize_itinerary_by_proximity(user_id, trip_id)
+    # 1) Optimize in memory
+    optimized, _ = optimize_itinerary_data(original, use_cache=use_cache)
 
-    # 3) Persist final authoritative version
+    # 2) Single authoritative write (includes itinerary, trip_name, dates, etc.)
+    doc = dict(payload)
     if optimized:
-        itinerary_doc(user_id, trip_id).update({"itinerary": optimized})
-
-    # 4) Return optimized
-    return optimized or payload.get("itinerary", {})
+        doc["itinerary"] = optimized
+        doc["itinerary_original_backup"] = original
+    itinerary_doc(user_id, trip_id).set(doc, merge=False)
 
+    # 3) Return optimized
+    return optimized or original
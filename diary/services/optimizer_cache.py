@@ -0,0 +1,78 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Coordinates are rounded before hashing (~0.1 m) so float noise from
+# JSON round-trips does not split one itinerary into several keys.
+COORD_PRECISION = 6
+MAX_ENTRIES = int(os.getenv("OPTIMIZER_CACHE_SIZE", "512"))
+
+
+def fingerprint(coords: List[Tuple[float, float]], num_days: int, *variant) -> Tuple[str, List[int]]:
+    """
+    Content address for an optimization input.
+
+    Returns (key, canonical) where canonical[r] is the index in `coords` of the
+    r-th point in sorted order. Cached results are stored as canonical ranks,
+    so a hit maps back onto the caller's POI list no matter how the days
+    were ordered when it was saved.
+    """
+    rounded = [(round(lat, COORD_PRECISION), round(lng, COORD_PRECISION)) for lat, lng in coords]
+    canonical = sorted(range(len(rounded)), key=rounded.__getitem__)
+    h = hashlib.sha1()
+    h.update(f"{num_days}|{'|'.join(str(v) for v in variant)}|".encode())
+    for r in canonical:
+        h.update(b"%r,%r;" % rounded[r])
+    return h.hexdigest(), canonical
+
+
+class OptimizationCache:
+    """Thread-safe LRU of fingerprint -> optimized day split (in canonical ranks)."""
+
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._data),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Shared by optimize_itinerary_by_proximity and the save pipeline
+result_cache = OptimizationCache()
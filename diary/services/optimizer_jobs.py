@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# -----------------------------
+# Config
+# -----------------------------
+MAX_WORKERS = int(os.getenv("OPTIMIZER_MAX_WORKERS", "2"))
+MAX_PENDING_JOBS = int(os.getenv("OPTIMIZER_MAX_PENDING", "100"))
+JOB_TTL_SECONDS = int(os.getenv("OPTIMIZER_JOB_TTL_SECONDS", "900"))
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="proximity-optimizer")
+_lock = threading.Lock()
+_jobs: Dict[str, Dict[str, Any]] = {}
+# (user_id, trip_id) -> unfinished job ids in run order (only the first one runs)
+_inflight: Dict[Tuple[str, str], List[str]] = {}
+
+
+class OptimizerQueueFull(RuntimeError):
+    """Raised when MAX_PENDING_JOBS jobs are already waiting for a worker."""
+
+
+# -----------------------------
+# Internals
+# -----------------------------
+def _prune_finished(now: float) -> None:
+    expired = [
+        job_id for job_id, job in _jobs.items()
+        if job["finished_at"] and now - job["finished_at"] > JOB_TTL_SECONDS
+    ]
+    for job_id in expired:
+        del _jobs[job_id]
+
+
+def _start(job: Dict[str, Any]) -> None:
+    job["submitted"] = True
+    _executor.submit(_run, job["job_id"])
+
+
+def _run(job_id: str) -> None:
+    with _lock:
+        job = _jobs[job_id]
+        job["status"] = "running"
+        job["started_at"] = time.time()
+        fn, args, kwargs = job["call"]
+
+    try:
+        result = fn(*args, **kwargs)
+        outcome = {"status": "done", "result": result}
+    except Exception as e:
+        outcome = {"status": "failed", "error": str(e)}
+
+    with _lock:
+        job.update(outcome)
+        job["finished_at"] = time.time()
+        job["call"] = None
+
+        # Hand the trip over to the next job that was queued while this one ran
+        queue = _inflight[job["key"]]
+        queue.remove(job_id)
+        if queue:
+            _start(_jobs[queue[0]])
+        else:
+            del _inflight[job["key"]]
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+def submit_optimization(user_id: str, trip_id: str, fn: Callable[..., Any], *args,
+                        replace_pending: bool = False, **kwargs) -> str:
+    """
+    Queue fn(*args, **kwargs) on the bounded optimizer pool and return a job id.
+
+    Jobs for one (user_id, trip_id) run one at a time in submit order, so writes
+    for a trip never race. Requests are coalesced only into a job that would
+    produce the same result:
+      - replace_pending=False (re-optimize): an unfinished job with the identical
+        call (same fn, args and kwargs, e.g. improve/split) absorbs the request
+      - replace_pending=True (save): a job for the same fn still waiting for a
+        worker absorbs it and takes the newest arguments
+    Anything else is queued behind the trip's current jobs.
+    """
+    key = (user_id, trip_id)
+    call = (fn, args, kwargs)
+    now = time.time()
+    with _lock:
+        _prune_finished(now)
+
+        queue = _inflight.get(key, [])
+        for current_id in queue:
+            current = _jobs[current_id]
+            if replace_pending:
+                if current["status"] == "queued" and current["call"][0] is fn:
+                    current["call"] = call
+                    current["coalesced"] += 1
+                    return current_id
+            elif current["call"] is not None and current["call"] == call:
+                current["coalesced"] += 1
+                return current_id
+
+        pending = sum(1 for job in _jobs.values() if job["status"] == "queued")
+        if pending >= MAX_PENDING_JOBS:
+            raise OptimizerQueueFull(f"{pending} optimization jobs already pending")
+
+        job_id = str(uuid.uuid4())
+        job = {
+            "job_id": job_id,
+            "key": key,
+            "status": "queued",
+            "call": call,
+            "submitted": False,
+            "coalesced": 0,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        _jobs[job_id] = job
+        _inflight.setdefault(key, []).append(job_id)
+        # otherwise the job ahead of it starts this one when it finishes
+        if len(_inflight[key]) == 1:
+            _start(job)
+        return job_id
+
+
+def get_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """Status snapshot for a job id, or None if unknown/expired."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if not job:
+            return None
+        user_id, trip_id = job["key"]
+        return {
+            "job_id": job_id,
+            "user_id": user_id,
+            "trip_id": trip_id,
+            "status": job["status"],
+            "coalesced_requests": job["coalesced"],
+            "created_at": job["created_at"],
+            "started_at": job["started_at"],
+            "finished_at": job["finished_at"],
+            "result": job["result"],
+            "error": job["error"],
+        }
@@ -1,170 +1,154 @@
-import math
 import sys
 import os
+import time
 from typing import List, Dict, Tuple
-from copy import deepcopy
+
+import numpy as np
 
 # ✅ Fix Python import path to support running as script
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from diary.utils.firestore_paths import itinerary_doc
+from diary.services.distance_matrix import (
+    build_distance_matrix,
+    build_distance_matrix_np,
+    row_mean_distances,
+)
+from diary.services.route_search import (
+    nearest_neighbor_order,
+    route_cost,
+    two_opt,
+    or_opt,
+    DEFAULT_TIME_BUDGET_MS,
+)
+from diary.services.day_split import split_by_count, split_by_travel, SPLIT_MODES
+from diary.services.optimizer_cache import fingerprint, result_cache
+
+IMPROVE_MODES = ("two_opt", "or_opt")
 
 
 # -----------------------------
-# Distance utilities
+# Helpers
 # -----------------------------
-def haversine_km(a: Tuple[float, float], b: Tuple[float, float]) -> float:
-    R = 6371.0
-    lat1, lon1 = a
-    lat2, lon2 = b
-    d_lat = math.radians(lat2 - lat1)
-    d_lon = math.radians(lon2 - lon1)
-    la1 = math.radians(lat1)
-    la2 = math.radians(lat2)
-
-    h = (math.sin(d_lat / 2) ** 2
-         + math.cos(la1) * math.cos(la2) * math.sin(d_lon / 2) ** 2)
-    return 2 * R * math.asin(math.sqrt(h))
-
-
-def build_distance_matrix(coords: List[Tuple[float, float]]) -> List[List[float]]:
-    n = len(coords)
-    dist = [[0.0] * n for _ in range(n)]
-    for i in range(n):
-        for j in range(i + 1, n):
-            d = haversine_km(coords[i], coords[j])
-            dist[i][j] = d
-            dist[j][i] = d
-    return dist
+class _PoiRef:
+    """Compact optimizer view of one activity: its coordinates plus a reference
+    back to the untouched input dict (no copy until the output is assembled)."""
+    __slots__ = ("activity", "lat", "lng")
 
+    def __init__(self, activity: Dict, lat: float, lng: float):
+        self.activity = activity
+        self.lat = lat
+        self.lng = lng
 
-# -----------------------------
-# Global route: NN + 2-Opt
-# -----------------------------
-def nearest_neighbor_order(dist: List[List[float]], start_idx: int = 0) -> List[int]:
-    n = len(dist)
-    unvisited = set(range(n))
-    order = [start_idx]
-    unvisited.remove(start_idx)
-    while unvisited:
-        last = order[-1]
-        nxt = min(unvisited, key=lambda j: dist[last][j])
-        order.append(nxt)
-        unvisited.remove(nxt)
-    return order
-
-
-def route_cost(order: List[int], dist: List[List[float]]) -> float:
-    return sum(dist[order[i]][order[i + 1]] for i in range(len(order) - 1))
-
-
-def two_opt(order: List[int], dist: List[List[float]], max_passes: int = 10) -> List[int]:
-    """Simple 2-opt to improve NN path; no wrap (not a cycle)."""
-    best = order[:]
-    best_cost = route_cost(best, dist)
-    n = len(order)
-    improved = True
-    passes = 0
-
-    while improved and passes < max_passes:
-        improved = False
-        passes += 1
-        for i in range(0, n - 3):
-            for k in range(i + 2, n - 1):
-                new_order = best[:i + 1] + best[i + 1:k + 1][::-1] + best[k + 1:]
-                new_cost = route_cost(new_order, dist)
-                if new_cost + 1e-9 < best_cost:
-                    best = new_order
-                    best_cost = new_cost
-                    improved = True
-        # if no improvement in this pass, we stop
-    return best
+    def to_output(self) -> Dict:
+        """Shallow copy of the activity with the normalized 'location' added."""
+        out = dict(self.activity)
+        out["location"] = {"lat": self.lat, "lng": self.lng}
+        return out
 
 
-# -----------------------------
-# Helpers
-# -----------------------------
-def _extract_all_pois(itinerary_data: Dict) -> List[Dict]:
-    """Flatten days -> list of POI dicts that include a normalized 'location'."""
+def _extract_all_pois(itinerary_data: Dict) -> List[_PoiRef]:
+    """Flatten days -> list of POI refs with normalized coordinates."""
     all_pois = []
     for _, activities in itinerary_data.items():
         if isinstance(activities, list):
             for poi in activities:
                 loc = poi.get("coordinates") or poi.get("location")
                 if loc and "lat" in loc and "lng" in loc:
-                    # normalize into poi["location"]
-                    poi = deepcopy(poi)
-                    poi["location"] = {"lat": float(loc["lat"]), "lng": float(loc["lng"])}
-                    all_pois.append(poi)
+                    all_pois.append(_PoiRef(poi, float(loc["lat"]), float(loc["lng"])))
     return all_pois
 
 
-def _choose_start_index(coords: List[Tuple[float, float]]) -> int:
-    """Heuristic: start near the point with min average distance to others (central-ish)."""
-    n = len(coords)
-    best_idx, best_avg = 0, float("inf")
-    for i in range(n):
-        avg = sum(haversine_km(coords[i], coords[j]) for j in range(n) if j != i) / (n - 1 if n > 1 else 1)
-        if avg < best_avg:
-            best_idx, best_avg = i, avg
-    return best_idx
+def _choose_start_index(dist) -> int:
+    """Heuristic: start near the point with min average distance to others (central-ish).
+    Reads row means from the already-built distance matrix."""
+    if not isinstance(dist, np.ndarray):
+        dist = np.asarray(dist, dtype=np.float64)
+    return int(np.argmin(row_mean_distances(dist)))
+
 
+def _improve_route(order: List[int], dist, improve: str, budget_ms: float) -> List[int]:
+    """2-Opt always; "or_opt" adds segment moves and a closing 2-Opt pass on the same budget."""
+    if improve not in IMPROVE_MODES:
+        raise ValueError(f"Unknown improve mode '{improve}'")
+    if improve == "two_opt":
+        return two_opt(order, dist, time_budget_ms=budget_ms)
+    route = two_opt(order, dist, time_budget_ms=budget_ms / 2)
+    route = or_opt(route, dist, time_budget_ms=budget_ms / 3)
+    return two_opt(route, dist, time_budget_ms=budget_ms / 6)
 
-def _split_into_days(order: List[int], num_days: int) -> List[List[int]]:
-    """Balanced split: sizes differ by at most 1."""
-    n = len(order)
-    base = n // num_days
-    remainder = n % num_days
-    sizes = [base + 1 if i < remainder else base for i in range(num_days)]
-    out, idx = [], 0
-    for s in sizes:
-        out.append(order[idx: idx + s])
-        idx += s
-    return out
+
+def _split_into_days(order: List[int], num_days: int, dist=None, mode: str = "count") -> List[List[int]]:
+    """Split modes: "count" sizes differ by at most 1; "distance"/"time" even out per-day travel load."""
+    if mode not in SPLIT_MODES:
+        raise ValueError(f"Unknown split mode '{mode}'")
+    if mode == "count":
+        return split_by_count(order, num_days)
+    return split_by_travel(order, dist, num_days, mode=mode)
 
 
 # -----------------------------
 # Main entry
 # -----------------------------
-def optimize_itinerary_by_proximity(user_id: str, trip_id: str, backup_original: bool = True) -> Dict:
+def optimize_itinerary_data(itinerary_data: Dict, vectorized: bool = True,
+                            two_opt_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+                            improve: str = "two_opt", split: str = "count",
+                            use_cache: bool = True) -> Tuple[Dict, Dict]:
     """
-    Global proximity optimization:
+    In-memory global proximity optimization (no Firestore I/O):
       1) Flatten all POIs (ignore current Day buckets)
-      2) Build a single best path (NN + 2-Opt)
-      3) Split back into the same number of days (balanced)
-      4) Overwrite itinerary in Firestore (optionally store backup once)
+      2) Build a single best path (NN + 2-Opt) over one distance matrix
+         (vectorized NumPy by default; vectorized=False uses the pure-Python matrix).
+         2-Opt uses neighbour lists + O(1) move deltas and stops on two_opt_budget_ms;
+         improve="or_opt" adds an Or-opt segment-move stage within the same budget.
+      3) Split back into the same number of days: balanced by POI count (split="count"),
+         or by per-day travel distance / time (split="distance" | "time")
+    With use_cache, steps 2-3 are skipped when the same coordinate set, day count
+    and modes were optimized before (see optimizer_cache).
+
+    Returns (new_itinerary, meta). new_itinerary is {} when there is nothing to optimize.
     """
-    doc_ref = itinerary_doc(user_id, trip_id)
-    snap = doc_ref.get()
-    doc = snap.to_dict() if snap.exists else None
-
-    if not doc:
-        print("❌ No itinerary document found.")
-        return {}
+    started = time.perf_counter()
+    meta = {"poi_count": 0, "num_days": len(itinerary_data or {}), "improve": improve, "split": split}
 
-    itinerary_data = doc.get("itinerary", {})
     if not itinerary_data:
-        print("❌ 'itinerary' field is missing.")
-        return {}
+        return {}, meta
 
     num_days = len(itinerary_data)
     pois = _extract_all_pois(itinerary_data)
+    meta["poi_count"] = len(pois)
 
     if not pois:
-        print("❌ No POIs to optimize.")
-        return {}
-
-    # Coordinates & distance matrix
-    coords = [(p["location"]["lat"], p["location"]["lng"]) for p in pois]
-    dist = build_distance_matrix(coords)
-
-    # Build global route
-    start_idx = _choose_start_index(coords)
-    nn_order = nearest_neighbor_order(dist, start_idx=start_idx)
-    best_order = two_opt(nn_order, dist, max_passes=12)
-
-    # Split route back into days
-    index_days = _split_into_days(best_order, num_days)
+        return {}, meta
+
+    coords = [(p.lat, p.lng) for p in pois]
+
+    cached = None
+    if use_cache:
+        cache_key, canonical = fingerprint(coords, num_days, improve, split)
+        cached = result_cache.get(cache_key)
+
+    if cached:
+        index_days = [[canonical[r] for r in day] for day in cached["days"]]
+        route_km = cached["route_km"]
+    else:
+        # Distance matrix
+        dist = build_distance_matrix_np(coords) if vectorized else build_distance_matrix(coords)
+
+        # Build global route
+        start_idx = _choose_start_index(dist)
+        nn_order = nearest_neighbor_order(dist, start_idx=start_idx)
+        best_order = _improve_route(nn_order, dist, improve, two_opt_budget_ms)
+
+        # Split route back into days
+        index_days = _split_into_days(best_order, num_days, dist=dist, mode=split)
+        route_km = round(float(route_cost(best_order, dist)), 3)
+
+        if use_cache:
+            rank = {idx: r for r, idx in enumerate(canonical)}
+            result_cache.put(cache_key, {
+                "days": [[rank[j] for j in day] for day in index_days],
+                "route_km": route_km,
+            })
 
     # Build new itinerary mapping
     new_itinerary = {}
@@ -176,14 +160,56 @@ def optimize_itinerary_by_proximity(user_id: str, trip_id: str, backup_original:
         day_names = [f"Day {i+1}" for i in range(num_days)]
 
     for i, idxs in enumerate(index_days):
-        new_itinerary[day_names[i]] = [pois[j] for j in idxs]
+        # the only place output dicts are built
+        new_itinerary[day_names[i]] = [pois[j].to_output() for j in idxs]
+
+    meta["route_km"] = route_km
+    meta["cache"] = "off" if not use_cache else ("hit" if cached else "miss")
+    meta["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return new_itinerary, meta
+
+
+def optimize_itinerary_by_proximity(user_id: str, trip_id: str, backup_original: bool = True,
+                                    vectorized: bool = True,
+                                    two_opt_budget_ms: float = DEFAULT_TIME_BUDGET_MS,
+                                    improve: str = "two_opt", split: str = "count",
+                                    use_cache: bool = True) -> Dict:
+    """
+    Firestore wrapper around optimize_itinerary_data:
+    1 read, then 1 write of the optimized itinerary (plus the one-time backup, same write).
+    """
+    # Imported here so the pure optimizer above loads without Firebase credentials
+    # (benchmarks, itinerary_pipeline callers that only use optimize_itinerary_data)
+    from diary.utils.firestore_paths import itinerary_doc
+
+    doc_ref = itinerary_doc(user_id, trip_id)
+    snap = doc_ref.get()
+    doc = snap.to_dict() if snap.exists else None
+
+    if not doc:
+        print("❌ No itinerary document found.")
+        return {}
+
+    itinerary_data = doc.get("itinerary", {})
+    if not itinerary_data:
+        print("❌ 'itinerary' field is missing.")
+        return {}
+
+    new_itinerary, _ = optimize_itinerary_data(
+        itinerary_data, vectorized=vectorized, two_opt_budget_ms=two_opt_budget_ms,
+        improve=improve, split=split, use_cache=use_cache,
+    )
+    if not new_itinerary:
+        print("❌ No POIs to optimize.")
+        return {}
 
+    updates = {"itinerary": new_itinerary}
     # Optional: keep a one-time backup
     if backup_original and not doc.get("itinerary_original_backup"):
-        doc_ref.update({"itinerary_original_backup": itinerary_data})
+        updates["itinerary_original_backup"] = itinerary_data
 
     # Update Firestore
-    doc_ref.update({"itinerary": new_itinerary})
+    doc_ref.update(updates)
     print(f"✅ Itinerary globally optimized for user={user_id}, trip={trip_id}")
     return new_itinerary
 
@@ -0,0 +1,277 @@
+import heapq
+import time
+from typing import List, Optional
+
+import numpy as np
+
+DEFAULT_K_NEIGHBORS = 10
+DEFAULT_TIME_BUDGET_MS = 200.0
+
+
+# -----------------------------
+# Construction
+# -----------------------------
+def nearest_neighbor_order(dist: List[List[float]], start_idx: int = 0) -> List[int]:
+    if isinstance(dist, np.ndarray):
+        return _nearest_neighbor_order_np(dist, start_idx)
+    n = len(dist)
+    unvisited = set(range(n))
+    order = [start_idx]
+    unvisited.remove(start_idx)
+    while unvisited:
+        last = order[-1]
+        nxt = min(unvisited, key=lambda j: dist[last][j])
+        order.append(nxt)
+        unvisited.remove(nxt)
+    return order
+
+
+def _nearest_neighbor_order_np(dist: np.ndarray, start_idx: int = 0) -> List[int]:
+    """Same walk as nearest_neighbor_order, one argmin over a masked row per step."""
+    n = dist.shape[0]
+    visited = np.zeros(n, dtype=bool)
+    order = [start_idx]
+    visited[start_idx] = True
+    last = start_idx
+    for _ in range(n - 1):
+        row = np.where(visited, np.inf, dist[last])
+        last = int(np.argmin(row))
+        order.append(last)
+        visited[last] = True
+    return order
+
+
+def route_cost(order: List[int], dist: List[List[float]]) -> float:
+    return sum(dist[order[i]][order[i + 1]] for i in range(len(order) - 1))
+
+
+def build_neighbor_lists(dist, k: int = DEFAULT_K_NEIGHBORS) -> List[List[int]]:
+    """K nearest other nodes for every node, closest first."""
+    n = len(dist)
+    k = min(k, n - 1)
+    if k <= 0:
+        return [[] for _ in range(n)]
+
+    if isinstance(dist, np.ndarray):
+        # k+1 smallest per row (self is usually one of them), then sort just those
+        cand = np.argpartition(dist, k, axis=1)[:, :k + 1]
+        cand_d = np.take_along_axis(dist, cand, axis=1)
+        cand = np.take_along_axis(cand, np.argsort(cand_d, axis=1, kind="stable"), axis=1)
+        return [[j for j in row if j != i][:k] for i, row in enumerate(cand.tolist())]
+
+    out = []
+    for i in range(n):
+        row = dist[i]
+        out.append([j for j in heapq.nsmallest(k + 1, range(n), key=row.__getitem__) if j != i][:k])
+    return out
+
+
+# -----------------------------
+# Improvement: 2-Opt
+# -----------------------------
+def _reverse_delta(route: List[int], rows: List[List[float]], l: int, r: int, n: int) -> float:
+    """Cost change of reversing route[l..r] (1 <= l < r <= n-1) on an open path."""
+    p, x, y = route[l - 1], route[l], route[r]
+    delta = rows[p][y] - rows[p][x]
+    if r + 1 < n:
+        q = route[r + 1]
+        delta += rows[x][q] - rows[y][q]
+    return delta
+
+
+def _improve_around(i: int, route: List[int], pos: List[int], rows: List[List[float]],
+                    neighbors: List[List[int]], n: int) -> bool:
+    """
+    Try to make node route[i] adjacent to one of its near neighbours c by
+    replacing its successor edge or its predecessor edge. Applies the first
+    improving reversal found.
+    """
+    a = route[i]
+    for succ_side in (True, False):
+        if succ_side:
+            if i + 1 >= n:
+                continue
+            d_old = rows[a][route[i + 1]]
+        else:
+            if i < 1:
+                continue
+            d_old = rows[route[i - 1]][a]
+
+        for c in neighbors[a]:
+            if rows[a][c] >= d_old:
+                break  # neighbours are sorted, no later one can shorten this edge
+            j = pos[c]
+            if succ_side:
+                # drop (a, route[i+1]), add (a, c)
+                if j > i + 1:
+                    l, r = i + 1, j
+                elif j + 1 < i:
+                    l, r = j + 1, i
+                else:
+                    continue
+            else:
+                # drop (route[i-1], a), add (c, a)
+                if j > i + 1:
+                    l, r = i, j - 1
+                elif 1 <= j < i - 1:
+                    l, r = j, i - 1
+                else:
+                    continue
+
+            if _reverse_delta(route, rows, l, r, n) < -1e-9:
+                route[l:r + 1] = route[l:r + 1][::-1]
+                for idx in range(l, r + 1):
+                    pos[route[idx]] = idx
+                return True
+    return False
+
+
+def _full_sweep(route: List[int], pos: List[int], rows: List[List[float]], n: int, deadline: float) -> bool:
+    """Exhaustive pass over every reversal (still O(1) per move); applies the first improving one."""
+    for l in range(1, n - 1):
+        if time.perf_counter() > deadline:
+            return False
+        p, x = route[l - 1], route[l]
+        row_p, row_x = rows[p], rows[x]
+        d_px = row_p[x]
+        for r in range(l + 1, n):
+            y = route[r]
+            delta = row_p[y] - d_px
+            if r + 1 < n:
+                q = route[r + 1]
+                delta += row_x[q] - rows[y][q]
+            if delta < -1e-9:
+                route[l:r + 1] = route[l:r + 1][::-1]
+                for idx in range(l, r + 1):
+                    pos[route[idx]] = idx
+                return True
+    return False
+
+
+def two_opt(order: List[int], dist: List[List[float]], max_passes: Optional[int] = None,
+            k_neighbors: int = DEFAULT_K_NEIGHBORS,
+            time_budget_ms: float = DEFAULT_TIME_BUDGET_MS) -> List[int]:
+    """
+    2-opt on an open path (not a cycle); the first node stays fixed, the end is free.
+      - each candidate move reverses route[l..r] and is priced in O(1) from the
+        (at most) four edges it touches
+      - candidates come from the K nearest neighbours of each node; once those
+        are exhausted and budget remains, one exhaustive sweep looks for moves
+        the neighbour lists cannot see (e.g. long edges between city clusters)
+      - stops at a local optimum, on the time budget (ms), or after
+        max_passes sweeps if given
+    """
+    n = len(order)
+    route = order[:]
+    if n < 3:
+        return route
+
+    rows = dist.tolist() if isinstance(dist, np.ndarray) else dist
+    neighbors = build_neighbor_lists(dist, k_neighbors)
+    pos = [0] * n
+    for idx, node in enumerate(route):
+        pos[node] = idx
+
+    deadline = time.perf_counter() + time_budget_ms / 1000.0
+    improved = True
+    passes = 0
+    steps = 0  # clock read every 32 moves tried, across passes, so short routes are bounded too
+
+    while improved:
+        if max_passes is not None and passes >= max_passes:
+            break
+        improved = False
+        passes += 1
+        for i in range(n):
+            if (steps & 31) == 0 and time.perf_counter() > deadline:
+                return route
+            steps += 1
+            if _improve_around(i, route, pos, rows, neighbors, n):
+                improved = True
+        if not improved:
+            improved = _full_sweep(route, pos, rows, n, deadline)
+    return route
+
+
+# -----------------------------
+# Improvement: Or-Opt
+# -----------------------------
+def _try_or_move(i: int, seg_len: int, route: List[int], pos: List[int], rows: List[List[float]],
+                 neighbors: List[List[int]], n: int) -> bool:
+    """
+    Move route[i..i+seg_len-1] (optionally reversed) next to a near neighbour of
+    either segment end. Applies the first improving insertion found.
+    """
+    s0, s1 = route[i], route[i + seg_len - 1]
+    prev = route[i - 1]
+    nxt = route[i + seg_len] if i + seg_len < n else None
+
+    # what we save by cutting the segment out and closing the gap
+    removed = rows[prev][s0]
+    if nxt is not None:
+        removed += rows[s1][nxt] - rows[prev][nxt]
+
+    seen = set()
+    for c in neighbors[s0] + neighbors[s1]:
+        pc = pos[c]
+        if i <= pc < i + seg_len:
+            continue
+        # insert right after c, or right before c
+        for j in (pc, pc - 1):
+            if j < 0 or i - 1 <= j < i + seg_len or j in seen:
+                continue
+            seen.add(j)
+            u = route[j]
+            v = route[j + 1] if j + 1 < n else None
+            base = -rows[u][v] if v is not None else 0.0
+            fwd = rows[u][s0] + (rows[s1][v] if v is not None else 0.0) + base
+            rev = rows[u][s1] + (rows[s0][v] if v is not None else 0.0) + base
+            added, reverse = (rev, True) if rev < fwd else (fwd, False)
+
+            if added - removed < -1e-9:
+                seg = route[i:i + seg_len]
+                if reverse:
+                    seg.reverse()
+                del route[i:i + seg_len]
+                at = j + 1 if j < i else j + 1 - seg_len
+                route[at:at] = seg
+                lo, hi = min(i, at), max(i + seg_len, at + seg_len)
+                for idx in range(lo, hi):
+                    pos[route[idx]] = idx
+                return True
+    return False
+
+
+def or_opt(order: List[int], dist: List[List[float]], max_segment_len: int = 3,
+           k_neighbors: int = DEFAULT_K_NEIGHBORS,
+           time_budget_ms: float = DEFAULT_TIME_BUDGET_MS) -> List[int]:
+    """
+    Or-opt on an open path: relocate segments of 1..max_segment_len stops,
+    in either orientation, next to one of their K nearest neighbours.
+    Catches the "one far-away POI stuck in the wrong place" cases 2-opt
+    cannot fix with a single reversal. The first node stays fixed.
+    """
+    n = len(order)
+    route = order[:]
+    if n < 3:
+        return route
+
+    rows = dist.tolist() if isinstance(dist, np.ndarray) else dist
+    neighbors = build_neighbor_lists(dist, k_neighbors)
+    pos = [0] * n
+    for idx, node in enumerate(route):
+        pos[node] = idx
+
+    deadline = time.perf_counter() + time_budget_ms / 1000.0
+    improved = True
+    steps = 0  # clock read every 32 moves tried, across passes, so short routes are bounded too
+    while improved:
+        improved = False
+        for seg_len in range(1, max_segment_len + 1):
+            for i in range(1, n - seg_len + 1):
+                if (steps & 31) == 0 and time.perf_counter() > deadline:
+                    return route
+                steps += 1
+                if _try_or_move(i, seg_len, route, pos, rows, neighbors, n):
+                    improved = True
+    return route
@@ -2,6 +2,8 @@
 from flask import Blueprint, request, jsonify, session, current_app
 from firebase_admin import firestore
 from user_auth.utils import login_required_user # We want to verify who is Browse
+from utils.gem_cache import CACHED_STATUS, gem_cache
+from utils.gem_queries import query_gem_submissions
 
 def create_discovery_bp(db_instance): # Function to create and return the blueprint
     discovery_bp = Blueprint('discovery_bp', __name__, url_prefix='/discover')
@@ -17,24 +19,30 @@ def create_discovery_bp(db_instance): # Function to create and return the bluepr
         page_token = request.args.get('page_token')
         status_filter = request.args.get('status', 'verified') # Only show approved gems by default
 
-        # --- Perform a Collection Group Query ---
-        # This queries across all 'gem_submissions' subcollections, regardless of parent location
-        gems_query = db_instance.collection_group('gem_submissions').where('status', '==', status_filter)
-
-        # Note: For pagination with start_at, you need a stable order_by
-        gems_query = gems_query.order_by('timestamp', direction=firestore.Query.DESCENDING)
-
-        # Apply page size limit
-        gems_query = gems_query.limit(page_size)
+        # --- Optional filters, applied by Firestore ---
+        city_filter = request.args.get('city')
+        tags_filter = request.args.get('tags')  # comma-separated, matches any
 
         # Apply a page token if provided for pagination
+        start_after = None
         if page_token:
-            gems_query = gems_query.start_after({u'timestamp': firestore.SERVER_TIMESTAMP}) # This needs to be the actual last item's timestamp
+            start_after = {u'timestamp': firestore.SERVER_TIMESTAMP} # This needs to be the actual last item's timestamp
             # Note: Correct pagination in Firestore requires getting the last document from the previous page's stream.
             # For this implementation, we'll simplify and acknowledge the full pagination logic is more complex.
 
-        try:
-            gems_docs = gems_query.stream()
+        def load_page():
+            # --- Perform a Collection Group Query ---
+            # This queries across all 'gem_submissions' subcollections, regardless of parent location
+            gems_docs, query_count = query_gem_submissions(
+                db_instance,
+                status=status_filter,
+                city_names=[city_filter] if city_filter else None,
+                tags=tags_filter.split(',') if tags_filter else None,
+                order_by='timestamp',  # stable order for pagination
+                limit=page_size,
+                start_after=start_after,
+            )
+            current_app.logger.info(f"Hidden gem listing served with {query_count} Firestore queries.")
             gems_list = []
             for doc in gems_docs:
                 gem_data = doc.to_dict()
@@ -50,6 +58,16 @@ def create_discovery_bp(db_instance): # Function to create and return the bluepr
                     "timestamp": gem_data.get('timestamp')
                 }
                 gems_list.append(public_gem_data)
+            return gems_list
+
+        try:
+            # Verified pages are cached per filter set and dropped when a verified gem in that city
+            # changes; the cache listener only watches verified gems, so other statuses are read fresh
+            if status_filter == CACHED_STATUS:
+                cache_key = gem_cache.key(city_filter, 'discover', status_filter, tags_filter or '', page_size, page_token or '')
+                gems_list = gem_cache.get_or_load(cache_key, load_page)
+            else:
+                gems_list = load_page()
 
             # Check if there are more results for the next page
             # This is a basic check; full pagination would return an actual token
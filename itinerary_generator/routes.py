@@ -13,15 +13,42 @@ import uuid
 # --- Import all of your teammate's modules ---
 from Itinerarybuilder.itinerary_builder import generate_itinerary, TAG_TO_BEST_TIME
 from Itinerarybuilder.query_firestore import get_filtered_pois
-from Itinerarybuilder.fetch_places import fetch_places
-from Itinerarybuilder.get_reviews import get_reviews_for_place
-from Itinerarybuilder.tag_reviews import tag_place_with_reviews, has_kid_friendly_issues
+from Itinerarybuilder.fetch_places import fetch_places, places_cache_stats
+from Itinerarybuilder.get_reviews import get_reviews_for_places, review_cache_stats
+from Itinerarybuilder.tag_reviews import tag_places_with_reviews, has_kid_friendly_issues
 from Itinerarybuilder.store_firestore import store_itinerary
 from Itinerarybuilder.store_pois import store_pois
 from Itinerarybuilder.utils.itinerary_utils import estimate_required_pois, infer_kid_friendly
 from Itinerarybuilder.utils.place_info import map_price_level
+from Itinerarybuilder.utils.review_tag_cache import review_tag_cache
+from utils.gem_cache import gem_cache
 from shared_globals import session_store # Ensure session_store is imported if needed elsewhere
 
+def _tag_and_store_places(location, new_places):
+    """Fetch reviews, tag and normalize fresh Google places, then save them to places/{location}/poi_list."""
+    reviews_per_place = get_reviews_for_places([place["place_id"] for place in new_places])
+
+    # Classify every review of every new place in one batched pass
+    tags_per_place = tag_places_with_reviews(
+        [(place["name"], reviews) for place, reviews in zip(new_places, reviews_per_place)]
+    )
+
+    for place, reviews, tags in zip(new_places, reviews_per_place, tags_per_place):
+        kid_warning = has_kid_friendly_issues(reviews)
+
+        place["tags"] = tags
+        place["budget_category"] = map_price_level(place.get("price_level"))
+        if kid_warning:
+            place["kid_friendly"] = False
+        else:
+            place["kid_friendly"] = infer_kid_friendly(tags) if infer_kid_friendly(tags) is not None else False
+        place.setdefault("pet_friendly", False)
+        place.setdefault("wheelchair_accessible", False)
+        place.setdefault("disclaimer", "")
+
+    store_pois(location, new_places)
+
+
 def create_itinerary_bp(db_instance): # Function to create and return the blueprint
     itinerary_bp = Blueprint('itinerary_bp', __name__, url_prefix='/itinerary')
 
@@ -90,24 +117,11 @@ def create_itinerary_bp(db_instance): # Function to create and return the bluepr
             # Step 3: Fallback to Google Places if insufficient POIs
             if len(filtered_pois) < required_pois:
                 current_app.logger.info(f"⚠️ Only {len(filtered_pois)} POIs found, but {required_pois} needed. Fetching additional POIs...")
-                new_places = fetch_places(user_input["location"])
-
-                for place in new_places:
-                    reviews = get_reviews_for_place(place["place_id"])
-                    tags = tag_place_with_reviews(place["name"], reviews)
-                    kid_warning = has_kid_friendly_issues(reviews)
-
-                    place["tags"] = tags
-                    place["budget_category"] = map_price_level(place.get("price_level"))
-                    if kid_warning:
-                        place["kid_friendly"] = False
-                    else:
-                        place["kid_friendly"] = infer_kid_friendly(tags) if infer_kid_friendly(tags) is not None else False
-                    place.setdefault("pet_friendly", False)
-                    place.setdefault("wheelchair_accessible", False)
-                    place.setdefault("disclaimer", "")
-
-                store_pois(user_input["location"], new_places)
+                # First results page only; later pages are tagged and stored in the background
+                new_places = fetch_places(
+                    user_input["location"], prefetch=True, on_more_places=_tag_and_store_places
+                )
+                _tag_and_store_places(user_input["location"], new_places)
                 filtered_pois = get_filtered_pois(user_input)
 
             # Step 4: Generate itinerary
@@ -142,6 +156,16 @@ def create_itinerary_bp(db_instance): # Function to create and return the bluepr
         except Exception as e:
             current_app.logger.error(f"Error in itinerary generation pipeline for user {user_uid}: {e}", exc_info=True)
             return jsonify({"error": "Failed to generate itinerary.", "details": str(e)}), 500
+
+    @itinerary_bp.route('/cache-stats', methods=['GET'])
+    def google_cache_stats():
+        """Fresh/stale/miss counts and background-refresh lag of the Places and reviews caches, plus hidden gem and review-tag cache hit rates."""
+        return jsonify({
+            "places": places_cache_stats(),
+            "reviews": review_cache_stats(),
+            "hidden_gems": gem_cache.stats(),
+            "review_tags": review_tag_cache.stats(),
+        }), 200
             
     @itinerary_bp.route('/<itinerary_id>', methods=['GET'])
     @login_required_user
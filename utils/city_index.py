@@ -0,0 +1,143 @@
+import logging
+import os
+import re
+import threading
+import time
+
+from firebase_admin import firestore
+
+logger = logging.getLogger(__name__)
+
+# One small document maps normalized city keys to hidden_gems/{state}/cities/{city} paths,
+# so a hidden-gem lookup reads this doc (usually from memory) instead of listing every state and city.
+INDEX_COLLECTION = "hidden_gems_index"
+INDEX_DOCUMENT = "cities"
+# How long a process trusts its copy of the index doc before re-reading it
+CITY_INDEX_TTL_SECONDS = int(os.getenv("CITY_INDEX_TTL_SECONDS", "300"))
+
+# Canonical key -> other names people (or Google) use for the same city
+CITY_ALIASES = {
+    "bengaluru": ["bangalore", "bengalooru"],
+    "mumbai": ["bombay"],
+    "chennai": ["madras"],
+    "kolkata": ["calcutta"],
+    "mysuru": ["mysore"],
+    "gurugram": ["gurgaon"],
+    "kochi": ["cochin"],
+    "puducherry": ["pondicherry", "pondy"],
+    "thiruvananthapuram": ["trivandrum"],
+    "varanasi": ["banaras", "benaras", "kashi"],
+    "vadodara": ["baroda"],
+    "prayagraj": ["allahabad"],
+}
+_ALIAS_TO_CANONICAL = {alias: canonical for canonical, aliases in CITY_ALIASES.items() for alias in aliases}
+
+
+def normalize_city(name):
+    """'Bangalore ' / 'bengaluru' / 'Bengaluru' -> 'bengaluru' (lowercase, alphanumerics only, aliases folded)."""
+    key = re.sub(r"[^a-z0-9]", "", (name or "").lower())
+    return _ALIAS_TO_CANONICAL.get(key, key)
+
+
+class CityIndex:
+    """
+    Normalized city name -> [(state, city), ...] document paths under hidden_gems.
+
+    The mapping lives in hidden_gems_index/cities (field "cities": {key: ["state/city", ...]})
+    and is cached per process for ttl_seconds. add() is called whenever a gem is
+    written; if the index doc does not exist yet it is rebuilt once from the
+    state/city hierarchy.
+    """
+
+    def __init__(self, ttl_seconds=CITY_INDEX_TTL_SECONDS):
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._cities = None
+        self._loaded_at = 0.0
+        self.loads = 0
+        self.rebuilds = 0
+
+    def _doc(self, db):
+        return db.collection(INDEX_COLLECTION).document(INDEX_DOCUMENT)
+
+    def _mapping(self, db):
+        with self._lock:
+            if self._cities is not None and time.time() - self._loaded_at <= self.ttl_seconds:
+                return self._cities
+
+        snapshot = self._doc(db).get()
+        if snapshot.exists:
+            cities = (snapshot.to_dict() or {}).get("cities", {})
+        else:
+            cities = self.rebuild(db)
+
+        with self._lock:
+            self._cities = cities
+            self._loaded_at = time.time()
+            self.loads += 1
+        return cities
+
+    def paths_for(self, db, location):
+        """(state, city) pairs whose city matches `location` exactly or, failing that, by substring."""
+        key = normalize_city(location)
+        if not key:
+            return []
+        cities = self._mapping(db)
+
+        paths = cities.get(key)
+        if paths is None:
+            # Same leniency as the old walk: "bengaluru" matches a "Bengaluru Urban" city doc
+            paths = [p for city_key, city_paths in cities.items()
+                     if city_key and (key in city_key or city_key in key)
+                     for p in city_paths]
+        return [tuple(p.split("/", 1)) for p in dict.fromkeys(paths)]
+
+    def add(self, db, state, city):
+        """Record hidden_gems/{state}/cities/{city}; idempotent."""
+        key = normalize_city(city)
+        if not key:
+            return
+        path = f"{state}/{city}"
+        # A merge into a missing doc would create an index holding only this city
+        # (and _mapping would then never rebuild), so make sure the full index exists first.
+        # The rebuild walk already sees this gem's city, as the gem is written before add().
+        self._mapping(db)
+        self._doc(db).set({"cities": {key: firestore.ArrayUnion([path])}}, merge=True)
+
+        with self._lock:
+            if self._cities is not None:
+                paths = self._cities.setdefault(key, [])
+                if path not in paths:
+                    paths.append(path)
+
+    def rebuild(self, db):
+        """Walk hidden_gems/{state}/cities once and (re)write the index doc."""
+        cities = {}
+        for state_ref in db.collection("hidden_gems").list_documents():
+            for city_ref in state_ref.collection("cities").list_documents():
+                key = normalize_city(city_ref.id)
+                if key:
+                    cities.setdefault(key, []).append(f"{state_ref.id}/{city_ref.id}")
+
+        # merge: a city added by another worker during the walk is kept
+        self._doc(db).set({"cities": cities}, merge=True)
+        with self._lock:
+            self.rebuilds += 1
+        logger.info(f"Rebuilt hidden gem city index: {len(cities)} cities.")
+        return cities
+
+    def invalidate(self):
+        with self._lock:
+            self._cities = None
+
+    def stats(self):
+        with self._lock:
+            return {
+                "cities": len(self._cities) if self._cities is not None else None,
+                "loads": self.loads,
+                "rebuilds": self.rebuilds,
+            }
+
+
+# Shared by app.push_to_firestore (writes) and itinerary_builder (lookups)
+city_index = CityIndex()
@@ -0,0 +1,136 @@
+import logging
+import os
+import threading
+import time
+
+from utils.city_index import normalize_city
+
+logger = logging.getLogger(__name__)
+
+# Only verified-gem results are cached (CACHED_STATUS); listings for any other status
+# (pending, rejected, ...) always go to Firestore. Verified gems only change when one
+# is submitted or an admin changes a status. Status changes reach every worker through
+# the Firestore listener on verified gems (GEM_CACHE_LISTENER, on by default; it reads
+# the verified gems once at startup). With GEM_CACHE_LISTENER=0, or if the listener
+# cannot start, a status change surfaces only after GEM_CACHE_TTL_SECONDS: a newly
+# verified/rejected gem can stay invisible/visible that long. Code that changes a
+# gem's status in-process should also call gem_cache.invalidate(city).
+CACHED_STATUS = "verified"
+GEM_CACHE_TTL_SECONDS = int(os.getenv("GEM_CACHE_TTL_SECONDS", "900"))
+GEM_CACHE_MAX_ENTRIES = int(os.getenv("GEM_CACHE_MAX_ENTRIES", "1000"))
+GEM_CACHE_LISTENER = os.getenv("GEM_CACHE_LISTENER", "1") == "1"
+
+
+def city_of_gem_path(path):
+    """'hidden_gems/{state}/cities/{city}/gem_submissions/{id}' -> '{city}' (None if not that shape)."""
+    parts = path.split("/")
+    return parts[3] if len(parts) >= 6 and parts[0] == "hidden_gems" else None
+
+
+class HiddenGemCache:
+    """
+    In-process TTL cache of hidden-gem query results.
+
+    Keys are tuples whose first element is the city the result belongs to
+    (normalized with city_index.normalize_city) or None for results spanning
+    all cities, e.g. the /discover listing. invalidate(city) drops that city's
+    entries and every cross-city entry, since a gem change shows up in both.
+    """
+
+    def __init__(self, ttl_seconds=GEM_CACHE_TTL_SECONDS, max_entries=GEM_CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        # Bumped by invalidate(): per city key (None = cross-city entries) and for everything,
+        # so a load that started before an invalidation is not written back afterwards
+        self._generations = {}
+        self._epoch = 0
+        self._listener = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(city, *parts):
+        return (normalize_city(city) if city else None,) + tuple(parts)
+
+    def _generation(self, key):
+        return self._epoch, self._generations.get(key[0], 0)
+
+    def get_or_load(self, key, loader):
+        """Cached value for key, else loader() (stored unless it raises or was invalidated meanwhile)."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] <= self.ttl_seconds:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation(key)
+
+        value = loader()
+        with self._lock:
+            if self._generation(key) != generation:
+                return value
+            if len(self._entries) >= self.max_entries:
+                # drop the oldest tenth rather than one entry per insert
+                for old_key, _ in sorted(self._entries.items(), key=lambda kv: kv[1][0])[:max(1, self.max_entries // 10)]:
+                    del self._entries[old_key]
+            self._entries[key] = (time.time(), value)
+        return value
+
+    def invalidate(self, city=None):
+        """Drop a city's entries (and all cross-city ones); no city = drop everything."""
+        city_key = normalize_city(city) if city else None
+        with self._lock:
+            if city_key is None:
+                self._entries.clear()
+                self._epoch += 1
+            else:
+                for key in [k for k in self._entries if k[0] in (city_key, None)]:
+                    del self._entries[key]
+                for gen_key in (city_key, None):
+                    self._generations[gen_key] = self._generations.get(gen_key, 0) + 1
+            self.invalidations += 1
+
+    def start_listener(self, db):
+        """Invalidate on any verified gem add/change/delete, incl. leaving verified (one listener per process)."""
+        if self._listener is not None:
+            return
+        first_snapshot = threading.Event()
+
+        def on_snapshot(_docs, changes, _read_time):
+            # The first callback replays every existing doc; nothing cached can be stale yet
+            if not first_snapshot.is_set():
+                first_snapshot.set()
+                return
+            for city in {city_of_gem_path(change.document.reference.path) for change in changes}:
+                self.invalidate(city)
+
+        self._listener = db.collection_group("gem_submissions").where("status", "==", CACHED_STATUS).on_snapshot(on_snapshot)
+        logger.info("Hidden gem cache listening for verified gem changes.")
+
+    def start_listener_from_env(self, db):
+        if GEM_CACHE_LISTENER:
+            try:
+                self.start_listener(db)
+            except Exception as e:
+                logger.warning(f"Hidden gem cache listener not started: {e}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+                "invalidations": self.invalidations,
+                "ttl_seconds": self.ttl_seconds,
+                "listener": self._listener is not None,
+            }
+
+
+# Shared by itinerary_builder, discovery_apis and app.push_to_firestore
+gem_cache = HiddenGemCache()
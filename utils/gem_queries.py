@@ -0,0 +1,85 @@
+from firebase_admin import firestore
+
+# Firestore caps the number of values in one array_contains_any filter
+ARRAY_CONTAINS_ANY_LIMIT = 30
+# Lowercased/stripped copy of "tags" written next to it, so tag filters can run server-side
+NORMALIZED_TAGS_FIELD = "tags_normalized"
+
+
+def normalize_tags(tags):
+    """['Sunset ', 'sunset', 'Trek'] -> ['sunset', 'trek'] (order kept, duplicates dropped)."""
+    if isinstance(tags, str):
+        tags = [tags]
+    return list(dict.fromkeys(tag.lower().strip() for tag in tags or [] if tag and tag.strip()))
+
+
+def query_gem_submissions(db, status="verified", city_names=None, tags=None, order_by=None,
+                          descending=True, limit=None, start_after=None):
+    """
+    Collection-group query over every gem_submissions subcollection.
+
+    Filters are applied by Firestore: status equality, city_name equality (one
+    query per city name) and array_contains_any on the normalized tags (one query
+    per ARRAY_CONTAINS_ANY_LIMIT tags). Results of the sub-queries are merged,
+    de-duplicated and, if order_by is given, re-sorted and cut to limit.
+
+    Returns (docs, query_count).
+    """
+    base = db.collection_group("gem_submissions").where("status", "==", status)
+
+    city_filters = [("city_name", "==", name) for name in dict.fromkeys(city_names)] if city_names else [None]
+    tag_values = normalize_tags(tags) if tags is not None else None
+    if tag_values == []:
+        return [], 0
+    tag_filters = [
+        (NORMALIZED_TAGS_FIELD, "array_contains_any", tag_values[i:i + ARRAY_CONTAINS_ANY_LIMIT])
+        for i in range(0, len(tag_values), ARRAY_CONTAINS_ANY_LIMIT)
+    ] if tag_values else [None]
+
+    docs = {}
+    query_count = 0
+    for city_filter in city_filters:
+        for tag_filter in tag_filters:
+            query = base
+            for f in (city_filter, tag_filter):
+                if f:
+                    query = query.where(*f)
+            if order_by:
+                direction = firestore.Query.DESCENDING if descending else firestore.Query.ASCENDING
+                query = query.order_by(order_by, direction=direction)
+            if limit:
+                query = query.limit(limit)
+            if start_after:
+                query = query.start_after(start_after)
+
+            for doc in query.stream():
+                docs.setdefault(doc.reference.path, doc)
+            query_count += 1
+
+    results = list(docs.values())
+    if order_by and query_count > 1:
+        results.sort(key=lambda d: str((d.to_dict() or {}).get(order_by) or ""), reverse=descending)
+    if limit:
+        results = results[:limit]
+    return results, query_count
+
+
+def backfill_normalized_tags(db, batch_size=300):
+    """Write tags_normalized on gems stored before it existed; returns the number updated."""
+    batch = db.batch()
+    pending = updated = 0
+    for doc in db.collection_group("gem_submissions").stream():
+        data = doc.to_dict() or {}
+        normalized = normalize_tags(data.get("tags", []))
+        if data.get(NORMALIZED_TAGS_FIELD) == normalized:
+            continue
+        batch.update(doc.reference, {NORMALIZED_TAGS_FIELD: normalized})
+        pending += 1
+        updated += 1
+        if pending >= batch_size:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
+    return updated
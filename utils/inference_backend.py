@@ -0,0 +1,79 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+# CPU inference backends for the tagging models:
+#   fp32 - stock PyTorch weights (reference accuracy)
+#   int8 - PyTorch dynamic int8 quantization of every nn.Linear (no extra deps)
+#   onnx - ONNX Runtime export via optimum (pip install "optimum[onnxruntime]")
+BACKENDS = ("fp32", "int8", "onnx")
+
+# Default for both taggers; REVIEW_TAGGER_BACKEND / DESCRIPTION_TAGGER_BACKEND override per tagger
+TAGGER_BACKEND = os.getenv("TAGGER_BACKEND", "fp32")
+
+
+def backend_for(tagger_env_var):
+    """Resolve the configured backend for one tagger (e.g. "REVIEW_TAGGER_BACKEND")."""
+    backend = (os.getenv(tagger_env_var) or TAGGER_BACKEND).strip().lower()
+    if backend not in BACKENDS:
+        raise ValueError(f"{tagger_env_var}/TAGGER_BACKEND must be one of {BACKENDS}, got '{backend}'")
+    return backend
+
+
+def cache_model_id(model_name, backend):
+    """Model id used in result-cache keys; quantized backends score slightly differently."""
+    return model_name if backend == "fp32" else f"{model_name}@{backend}"
+
+
+def _quantize_int8(module):
+    import torch
+    return torch.quantization.quantize_dynamic(module, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _require_optimum():
+    try:
+        from optimum.onnxruntime import ORTModelForSequenceClassification  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "The 'onnx' tagger backend needs optimum with ONNX Runtime: "
+            "pip install \"optimum[onnxruntime]\""
+        ) from e
+
+
+def load_zero_shot_pipeline(model_name, backend="fp32"):
+    """transformers zero-shot-classification pipeline on CPU for the given backend."""
+    from transformers import pipeline
+
+    if backend == "onnx":
+        _require_optimum()
+        from optimum.onnxruntime import ORTModelForSequenceClassification
+        from transformers import AutoTokenizer
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        tokenizer = AutoTokenizer.from_pretrained(model_name)
+        classifier = pipeline("zero-shot-classification", model=model, tokenizer=tokenizer)
+    else:
+        classifier = pipeline(
+            "zero-shot-classification",
+            model=model_name,
+            device=-1  # ✅ CPU now, switch to device=0 when moving to GPU
+        )
+        if backend == "int8":
+            classifier.model = _quantize_int8(classifier.model)
+    logger.info(f"Loaded zero-shot pipeline {model_name} ({backend})")
+    return classifier
+
+
+def load_sentence_encoder(model_name, backend="fp32"):
+    """SentenceTransformer for the given backend (onnx needs sentence-transformers >= 3.2)."""
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "onnx":
+        _require_optimum()
+        model = SentenceTransformer(model_name, backend="onnx")
+    else:
+        model = SentenceTransformer(model_name, device="cpu")
+        if backend == "int8":
+            model = _quantize_int8(model)
+    logger.info(f"Loaded sentence encoder {model_name} ({backend})")
+    return model
@@ -0,0 +1,75 @@
+import hashlib
+import logging
+import os
+import threading
+from pathlib import Path
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Default location: <repo>/cache/label_embeddings (override with LABEL_EMBEDDING_CACHE_DIR)
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parents[1] / "cache" / "label_embeddings"
+
+_lock = threading.Lock()
+_memory = {}
+
+
+def _cache_key(model_name, labels):
+    h = hashlib.sha256()
+    h.update(model_name.encode("utf-8"))
+    h.update(b"\x00")
+    h.update("\x1f".join(labels).encode("utf-8"))
+    return h.hexdigest()[:24]
+
+
+def normalize_rows(vectors):
+    """L2-normalize each row so a dot product is cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def get_label_embeddings(model, model_name, labels):
+    """
+    Unit-norm embeddings of `labels` under `model`, shape (len(labels), dim).
+
+    Computed once per (model name, label list): kept in memory for the process
+    and saved as .npy under the cache dir so restarts skip the encode too.
+    """
+    labels = list(labels)
+    key = _cache_key(model_name, labels)
+    cached = _memory.get(key)
+    if cached is not None:
+        return cached
+
+    with _lock:
+        cached = _memory.get(key)
+        if cached is not None:
+            return cached
+
+        cache_dir = Path(os.getenv("LABEL_EMBEDDING_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        path = cache_dir / f"{key}.npy"
+        embeddings = None
+        if path.is_file():
+            try:
+                embeddings = np.load(path)
+                if embeddings.shape[0] != len(labels):
+                    embeddings = None
+            except (OSError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable label-embedding cache {path}: {e}")
+                embeddings = None
+
+        if embeddings is None:
+            embeddings = normalize_rows(model.encode(labels))
+            try:
+                cache_dir.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".{os.getpid()}.tmp.npy")
+                np.save(tmp, embeddings)
+                os.replace(tmp, path)
+            except OSError as e:
+                logger.warning(f"Could not persist label embeddings to {path}: {e}")
+
+        embeddings.setflags(write=False)
+        _memory[key] = embeddings
+        return embeddings
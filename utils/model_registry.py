@@ -0,0 +1,141 @@
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Comma-separated model names (or "all") to load synchronously by preload_from_env().
+# Meant for a pre-forking server (e.g. gunicorn --preload): the master loads the
+# weights once and forked workers share those pages copy-on-write.
+MODEL_PRELOAD = os.getenv("MODEL_PRELOAD", "")
+# Same format; loaded on a background thread after boot instead of on first request.
+MODEL_WARMUP = os.getenv("MODEL_WARMUP", "")
+
+
+def _rss_mb():
+    """Current resident set size of this process in MiB (Linux /proc, else peak RSS)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        return round(peak / (1024 * 1024 if os.uname().sysname == "Darwin" else 1024), 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+class ModelRegistry:
+    """
+    Named, lazily constructed models shared by the whole process.
+
+    Modules register a zero-argument loader at import time (cheap); the model is
+    built on the first get() and reused afterwards. Loads are serialized per
+    model, so concurrent first requests wait for one load instead of racing.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def register(self, name, loader):
+        with self._lock:
+            if name not in self._entries:
+                self._entries[name] = {
+                    "loader": loader,
+                    "model": None,
+                    "status": "registered",
+                    "load_lock": threading.Lock(),
+                    "load_seconds": None,
+                    "rss_delta_mb": None,
+                    "loaded_at": None,
+                    "loaded_in_pid": None,
+                    "error": None,
+                }
+
+    def get(self, name):
+        entry = self._entries.get(name)
+        if entry is None:
+            raise KeyError(f"Model '{name}' is not registered")
+        if entry["model"] is not None:
+            return entry["model"]
+
+        with entry["load_lock"]:
+            if entry["model"] is None:
+                self._load(name, entry)
+        return entry["model"]
+
+    def _load(self, name, entry):
+        entry["status"] = "loading"
+        rss_before = _rss_mb()
+        started = time.perf_counter()
+        try:
+            model = entry["loader"]()
+        except Exception as e:
+            entry["status"] = "failed"
+            entry["error"] = str(e)
+            logger.error(f"Model '{name}' failed to load: {e}")
+            raise
+        entry["load_seconds"] = round(time.perf_counter() - started, 2)
+        rss_after = _rss_mb()
+        if rss_before is not None and rss_after is not None:
+            entry["rss_delta_mb"] = round(rss_after - rss_before, 1)
+        entry["loaded_at"] = time.time()
+        entry["loaded_in_pid"] = os.getpid()
+        entry["error"] = None
+        entry["model"] = model
+        entry["status"] = "loaded"
+        logger.info(f"Model '{name}' loaded in {entry['load_seconds']}s (+{entry['rss_delta_mb']} MiB RSS)")
+
+    def _resolve(self, names):
+        if names in (None, "all"):
+            return list(self._entries)
+        if isinstance(names, str):
+            names = [n.strip() for n in names.split(",")]
+        return [n for n in names if n]
+
+    def preload(self, names=None):
+        """Load models now, in this thread (call before forking workers)."""
+        for name in self._resolve(names):
+            try:
+                self.get(name)
+            except Exception:
+                pass  # recorded in the entry; a later get() retries
+
+    def warm_async(self, names=None):
+        """Load models on a daemon thread so startup does not block on them."""
+        targets = self._resolve(names)
+        thread = threading.Thread(target=self.preload, args=(targets,), name="model-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def start_from_env(self):
+        """Apply MODEL_PRELOAD (blocking) then MODEL_WARMUP (background)."""
+        if MODEL_PRELOAD:
+            self.preload(MODEL_PRELOAD)
+        if MODEL_WARMUP:
+            self.warm_async(MODEL_WARMUP)
+
+    def stats(self):
+        models = {}
+        for name, entry in list(self._entries.items()):
+            models[name] = {
+                "status": entry["status"],
+                "load_seconds": entry["load_seconds"],
+                "rss_delta_mb": entry["rss_delta_mb"],
+                "loaded_at": entry["loaded_at"],
+                # differs from pid when the weights were inherited from a preloading parent
+                "loaded_in_pid": entry["loaded_in_pid"],
+                "error": entry["error"],
+            }
+        return {"pid": os.getpid(), "rss_mb": _rss_mb(), "models": models}
+
+
+# One registry per process (inherited by forked workers)
+model_registry = ModelRegistry()
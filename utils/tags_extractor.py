@@ -1,5 +1,8 @@
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+import numpy as np
+
+from utils.inference_backend import backend_for, cache_model_id, load_sentence_encoder
+from utils.label_embeddings import get_label_embeddings
+from utils.model_registry import model_registry
 
 LABELS = [
     "romantic", "adventurous", "family-friendly", "spiritual", "sunset", "nature",
@@ -7,7 +10,17 @@ LABELS = [
     "trek", "local food", "viewpoint"
 ]
 
-model = SentenceTransformer('all-MiniLM-L6-v2')
+MODEL_NAME = 'all-MiniLM-L6-v2'
+# fp32 | int8 | onnx (DESCRIPTION_TAGGER_BACKEND, else TAGGER_BACKEND)
+BACKEND = backend_for("DESCRIPTION_TAGGER_BACKEND")
+
+
+def _load_model():
+    return load_sentence_encoder(MODEL_NAME, BACKEND)
+
+
+# Loaded on first use (or by model_registry preload/warm-up), shared process-wide
+model_registry.register(MODEL_NAME, _load_model)
 
 """ def extract_tags(description):
     tags = []
@@ -37,12 +50,7 @@ model = SentenceTransformer('all-MiniLM-L6-v2')
 
     return tags """
 
-def extract_tags(description, threshold=0.4, top_n=3):
-    desc_embedding = model.encode([description])
-    label_embeddings = model.encode(LABELS)
-
-    similarities = cosine_similarity(desc_embedding, label_embeddings)[0]
-    
+def _select_tags(similarities, threshold, top_n):
     tag_scores = list(zip(LABELS, similarities))
     tag_scores.sort(key=lambda x: x[1], reverse=True)
 
@@ -55,3 +63,26 @@ def extract_tags(description, threshold=0.4, top_n=3):
                 break
 
     return selected
+
+
+def extract_tags(description, threshold=0.4, top_n=3):
+    return extract_tags_batch([description], threshold=threshold, top_n=top_n)[0]
+
+
+def label_similarities(texts, labels=LABELS, batch_size=32):
+    """Cosine similarity of every text to every label, shape (len(texts), len(labels)), one encode call."""
+    model = model_registry.get(MODEL_NAME)
+    label_embeddings = get_label_embeddings(model, cache_model_id(MODEL_NAME, BACKEND), labels)
+    text_embeddings = model.encode(list(texts), batch_size=batch_size, normalize_embeddings=True)
+    return np.asarray(text_embeddings, dtype=np.float32) @ label_embeddings.T
+
+
+def extract_tags_batch(descriptions, threshold=0.4, top_n=3, batch_size=32):
+    """
+    Tag many descriptions with one encode call (e.g. backfilling existing gem submissions).
+    Label embeddings come from the on-disk store, so scoring is one matrix product.
+    """
+    if not descriptions:
+        return []
+    similarities = label_similarities(descriptions, batch_size=batch_size)
+    return [_select_tags(row.tolist(), threshold, top_n) for row in similarities]